@@ -0,0 +1,306 @@
+import argparse
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from analyze_texts import THEMES, iter_texts, load_passage_keywords
+from extraction_cache import ExtractionCache, document_hash
+from instrumentation import span, instrumented_run
+from passage_index import PassageIndex
+from text_processing import ALL_OUTPUTS, get_nlp, iter_keyword_rows
+from theme_detection import ThemeDetector
+from tone_lexicon import get_tone_lexicon
+
+# 🛰️ WARM ANALYSIS SERVICE
+DEFAULT_HOST = "127.0.0.1"  # Local only; there is no authentication
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64  # Items handed to spaCy (or the theme/passage code) in one go
+DEFAULT_MAX_DELAY = 0.01  # Seconds a request waits for others to share its batch
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+class MicroBatcher:
+    """Groups items from concurrent requests into batches for one handler.
+
+    Items wait at most max_delay seconds (or until max_batch_size have arrived), then
+    the whole batch goes to handler(items) -> results on the executor, and each caller
+    gets its own results back. With a single-thread executor, batches queue up while
+    one is running, so busier periods automatically make for bigger batches.
+    """
+
+    def __init__(self, name, handler, executor, max_batch_size=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY):
+        self.name = name
+        self.handler = handler
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, items):
+        """Queues items and returns their results, in order."""
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        self._pending.extend(zip(items, futures))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await asyncio.gather(*futures)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self._handle, items)
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _handle(self, items):
+        with span(f"service.{self.name}_batch") as batch:
+            batch.add(docs=len(items))
+            return self.handler(items)
+
+class AnalysisService:
+    """Keeps the spaCy model, tone lexicon, theme detector and passage index loaded between requests."""
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, use_cache=True):
+        self.detector = ThemeDetector(THEMES)
+        self.index = PassageIndex()
+        self.cache = ExtractionCache() if use_cache else None
+        # spaCy work runs on one thread; the lighter steps get their own so they never queue behind it
+        self._nlp_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nlp")
+        self._light_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        options = {"max_batch_size": max_batch_size, "max_delay": max_delay}
+        self.extraction = MicroBatcher("extract", self._extract, self._nlp_executor, **options)
+        self.tones = MicroBatcher("tones", self._tag_tones, self._light_executor, **options)
+        self.themes = MicroBatcher("themes", self._count_themes, self._light_executor, **options)
+        self.passages = MicroBatcher("passages", self._query_passages, self._light_executor, **options)
+
+    def warm_up(self, index_corpus=False):
+        """Loads the model and lexicon now, and optionally brings the passage index up to date with the corpus."""
+        get_nlp()
+        get_tone_lexicon()
+        if index_corpus:
+            with span("service.index_corpus") as indexing:
+                indexing.add(docs=self.index.update(dict(iter_texts())))
+
+    def close(self):
+        self._nlp_executor.shutdown()
+        self._light_executor.shutdown()
+        self.index.close()
+        if self.cache:
+            self.cache.close()
+
+    # 🧺 Batch handlers: each takes a list of items and returns one result per item
+    def _extract(self, items):
+        """items are (category, outputs, text); returns each text's [term, kind, pos, tones, count] rows."""
+        groups = {}
+        for position, (category, outputs, text) in enumerate(items):
+            groups.setdefault((category, outputs), []).append((position, text))
+        results = [None] * len(items)
+        for (category, outputs), entries in groups.items():
+            texts = [text for _, text in entries]
+            try:
+                rows_by_hash = dict(iter_keyword_rows(texts, category, outputs, batch_size=len(texts), cache=self.cache))
+                group_results = [rows_by_hash[doc_hash] for doc_hash in map(document_hash, texts)]
+            except Exception as e:
+                group_results = [e] * len(entries)  # Only this group's requests fail, not the rest of the batch
+            for (position, _), result in zip(entries, group_results):
+                results[position] = result
+        return results
+
+    def _tag_tones(self, items):
+        """items are (category, term); returns each term's tones."""
+        by_category = {}
+        for category, term in items:
+            by_category.setdefault(category, set()).add(term)
+        lexicon = get_tone_lexicon()
+        tags = {}
+        for category, terms in by_category.items():
+            try:
+                tags[category] = lexicon.tag_terms(terms, category)
+            except Exception as e:
+                tags[category] = dict.fromkeys(terms, e)
+        return [_tones_or_error(tags[category][term]) for category, term in items]
+
+    def _count_themes(self, texts):
+        results = []
+        for text in texts:
+            try:
+                counts = self.detector.keyword_counts(text) @ self.detector.incidence
+                results.append(dict(zip(self.detector.themes, map(int, counts))))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _query_passages(self, queries):
+        answers = {}
+        for query in queries:
+            if query not in answers:  # Identical concurrent queries are answered once
+                keywords, num_passages, seed, names = query
+                try:
+                    answers[query] = self.index.extract_passages(list(keywords), num_passages, seed=seed,
+                                                                 names=set(names) if names is not None else None)
+                except Exception as e:
+                    answers[query] = e
+        return [answers[query] for query in queries]
+
+    # 🌐 HTTP handlers
+    async def handle_health(self, request):
+        return web.json_response({"status": "ok", "themes": self.detector.themes})
+
+    async def handle_extract(self, request):
+        body = await _json_body(request)
+        outputs, category = _outputs(body), _string(body, "category", "General")
+        rows = await self.extraction.submit([(category, outputs, text) for text in _strings(body, "texts")])
+        return web.json_response({"rows": rows})
+
+    async def handle_process_texts(self, request):
+        """Word frequencies across the posted texts, like text_processing.process_texts."""
+        body = await _json_body(request)
+        outputs, top_n = _outputs(body), _integer(body, "top_n", None)
+        counts = Counter()
+        for rows in await self.extraction.submit([("General", outputs, text) for text in _strings(body, "texts")]):
+            for term, _, _, _, count in rows:
+                counts[term] += count
+        return web.json_response({"frequencies": dict(counts.most_common(top_n) if top_n is not None else counts)})
+
+    async def handle_tones(self, request):
+        body = await _json_body(request)
+        category, terms = _string(body, "category", "General"), _strings(body, "terms")
+        tones = await self.tones.submit([(category, term) for term in terms])
+        return web.json_response({"tones": dict(zip(terms, tones))})
+
+    async def handle_detect_themes(self, request):
+        """Theme keyword counts per posted text (a list, or a {name: text} dict) and in total."""
+        body = await _json_body(request)
+        if isinstance(body.get("texts"), dict):
+            texts = _named_strings(body, "texts")
+            names, counts = list(texts), await self.themes.submit(list(texts.values()))
+        else:
+            texts = _strings(body, "texts")
+            names, counts = range(len(texts)), await self.themes.submit(texts)
+        totals = Counter()
+        for document_counts in counts:
+            totals.update(document_counts)
+        return web.json_response({
+            "totals": {theme: totals[theme] for theme in self.detector.themes},
+            "documents": dict(zip(map(str, names), counts)),
+        })
+
+    async def handle_passages(self, request):
+        body = await _json_body(request)
+        keywords = _strings(body, "keywords", None) or load_passage_keywords()
+        names = _strings(body, "names", None)
+        query = (tuple(keywords), _integer(body, "num_passages", 3), _integer(body, "seed", 0),
+                 tuple(names) if names is not None else None)
+        (passages,) = await self.passages.submit([query])
+        return web.json_response({"passages": passages})
+
+    async def handle_index(self, request):
+        """Adds or updates {name: text} documents in the passage index."""
+        documents = _named_strings(await _json_body(request), "documents")
+        loop = asyncio.get_running_loop()
+        indexed = await loop.run_in_executor(self._light_executor, self.index.update, documents)
+        return web.json_response({"indexed": indexed})
+
+    def app(self):
+        app = web.Application(client_max_size=MAX_REQUEST_BYTES)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_post("/extract", self.handle_extract)
+        app.router.add_post("/process_texts", self.handle_process_texts)
+        app.router.add_post("/tones", self.handle_tones)
+        app.router.add_post("/detect_themes", self.handle_detect_themes)
+        app.router.add_post("/passages", self.handle_passages)
+        app.router.add_post("/index", self.handle_index)
+        return app
+
+def _tones_or_error(tones):
+    return tones if isinstance(tones, Exception) else list(tones)
+
+# ✅ Request validation: a malformed request is rejected with 400 before it can join a batch
+_MISSING = object()
+
+def _bad_request(message):
+    return web.HTTPBadRequest(text=message)
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise _bad_request("The request body must be JSON")
+    if not isinstance(body, dict):
+        raise _bad_request("The request body must be a JSON object")
+    return body
+
+def _strings(body, key, default=_MISSING):
+    """A list of strings from the body; required unless a default is given."""
+    value = body.get(key, default)
+    if value is _MISSING:
+        raise _bad_request(f'"{key}" is required')
+    if value is not default and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+        raise _bad_request(f'"{key}" must be a list of strings')
+    return value
+
+def _named_strings(body, key):
+    """A {name: string} object from the body (required)."""
+    value = body.get(key)
+    if not (isinstance(value, dict) and all(isinstance(item, str) for item in value.values())):
+        raise _bad_request(f'"{key}" must be an object of name: text strings')
+    return value
+
+def _string(body, key, default):
+    value = body.get(key, default)
+    if not isinstance(value, str):
+        raise _bad_request(f'"{key}" must be a string')
+    return value
+
+def _integer(body, key, default):
+    value = body.get(key, default)
+    if value is not default and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+        raise _bad_request(f'"{key}" must be a non-negative integer')
+    return value
+
+def _outputs(body):
+    outputs = _strings(body, "outputs", list(ALL_OUTPUTS))
+    if not outputs or not set(outputs) <= set(ALL_OUTPUTS):
+        raise _bad_request(f'"outputs" must be a non-empty subset of {list(ALL_OUTPUTS)}')
+    return tuple(outputs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve text analysis over a local HTTP API with a warm spaCy model.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY)
+    parser.add_argument("--index-corpus", action="store_true", help="Index the saved corpus for passage queries at startup")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the extraction cache")
+    options = parser.parse_args(argv)
+
+    with instrumented_run("serve"):
+        service = AnalysisService(options.max_batch, options.max_delay, use_cache=not options.no_cache)
+        try:
+            print("🛰️ Loading the model and indexes...")
+            service.warm_up(index_corpus=options.index_corpus)
+            web.run_app(service.app(), host=options.host, port=options.port)
+        finally:
+            service.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,138 @@
+import json
 import os
-import re
-import random
-from collections import Counter
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
+from corpus_store import CorpusStore, CORPUS_FOLDER
+from theme_detection import ThemeDetector, load_themes, THEMES_FILE
+from instrumentation import span, instrumented_run
 
 # 📂 Folder where your downloaded texts are stored
 OUTPUT_FOLDER = "output"
 
-def load_texts():
-    """Reads all saved texts from the output folder."""
-    texts = {}
-    
-    for filename in os.listdir(OUTPUT_FOLDER):
-        if filename.endswith(".txt"):
-            with open(os.path.join(OUTPUT_FOLDER, filename), "r", encoding="utf-8") as f:
-                texts[filename] = f.read()
-    
-    return texts
-
-# Load all texts
-all_texts = load_texts()
-print(f"\n📂 Loaded {len(all_texts)} texts for analysis!\n")
+# Set ANALYZE_SINCE_RUN to a corpus run ID to analyze only documents added after it
+SINCE_RUN = os.environ.get("ANALYZE_SINCE_RUN") or None
+
+# Set ANALYZE_DOCUMENTS_TABLE to an exported documents file (or directory of them) to load from it instead
+DOCUMENTS_TABLE = os.environ.get("ANALYZE_DOCUMENTS_TABLE") or None
+
+def iter_texts(since_run=None):
+    """Yields (name, text) for every saved text, reading one file at a time.
+
+    Documents come from an exported documents table if ANALYZE_DOCUMENTS_TABLE is set,
+    else from the corpus store when there is one, each exactly once, and only those
+    added after `since_run` if given. Older trees without a store fall back to the
+    .txt files under the output folder.
+    """
+    if DOCUMENTS_TABLE:
+        from columnar_export import load_table  # pyarrow is only needed on this path
+
+        # Only the columns needed here are read, straight from the memory-mapped file
+        table = load_table(DOCUMENTS_TABLE, columns=["hash", "source", "title", "run_id", "text"])
+        for batch in table.to_batches():
+            for entry in batch.to_pylist():
+                if since_run is None or (entry["run_id"] or "") > since_run:  # Run IDs sort by start time
+                    yield f"{entry['source']}/{entry['title'] or 'untitled'} [{entry['hash'][:8]}]", entry["text"]
+        return
+
+    if os.path.exists(os.path.join(CORPUS_FOLDER, "manifest.jsonl")):
+        store = CorpusStore(CORPUS_FOLDER)
+        for entry in store.documents(since_run=since_run):
+            yield f"{entry['source']}/{entry['title'] or 'untitled'} [{entry['hash'][:8]}]", store.read(entry["hash"])
+        return
+
+    for dirpath, dirnames, filenames in os.walk(OUTPUT_FOLDER):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".txt"):
+                path = os.path.join(dirpath, filename)
+                with open(path, "r", encoding="utf-8") as f:
+                    yield os.path.relpath(path, OUTPUT_FOLDER), f.read()
+
+def load_texts(since_run=None):
+    """Reads all saved texts from the corpus store (or the output folder)."""
+    return dict(iter_texts(since_run))
+
+# Worker processes for summaries and theme counts (1 = run in this process)
+ANALYSIS_JOBS = int(os.environ.get("ANALYZE_JOBS", "1"))
 
 # 🔥 STEP 1: Summarize Each Text
-def summarize_texts(texts):
-    """Summarizes each text using Sumy's LSA summarizer."""
-    summaries = {}
-
-    for filename, content in texts.items():
-        try:
-            parser = PlaintextParser.from_string(content, Tokenizer("english"))
-            summarizer = LsaSummarizer()
-            summary = summarizer(parser.document, 3)  # Get 3 sentences as a summary
-            summaries[filename] = " ".join([str(sentence) for sentence in summary])
-        except:
-            summaries[filename] = "(Could not summarize: Text too short or complex.)"
-
-    return summaries
-
-summaries = summarize_texts(all_texts)
-
-print("\n📖 **Summaries of Texts:**")
-for file, summary in summaries.items():
-    print(f"\n📜 **{file} Summary:**\n{summary}\n")
+def summarize_texts(texts, n_jobs=ANALYSIS_JOBS):
+    """Summarizes each text with truncated-SVD LSA; returns {filename: {"summary", "seconds", "error"}}."""
+    from summarization import summarize_documents  # Imported here so importing this module stays cheap
+    return summarize_documents(texts, n_sentences=3, n_jobs=n_jobs)  # Get 3 sentences as a summary
 
 # 🔥 STEP 2: Detect LGBTQ+ Themes
-THEMES = {
-    "Forbidden Love": ["forbidden", "unspoken", "secret", "hidden", "unspeakable"],
-    "Homoeroticism": ["desire", "passion", "longing", "embrace", "lips", "touch", "yearning"],
-    "Repression": ["sin", "wrong", "shame", "hide", "deny", "suppress"],
-    "Masculinity & Affection": ["brotherhood", "comradeship", "manly", "affection", "devotion"],
-    "Society & Judgment": ["scandal", "trial", "ruined", "ostracized", "immoral"]
-}
-
-def detect_themes(texts):
-    """Scans texts and detects recurring queer themes based on keyword counts."""
-    theme_counts = {theme: 0 for theme in THEMES}
-
-    for filename, content in texts.items():
-        content_lower = content.lower()
-        for theme, keywords in THEMES.items():
-            for word in keywords:
-                theme_counts[theme] += len(re.findall(r'\b' + word + r'\b', content_lower))
+# Themes live in themes.json; point ANALYZE_THEMES_FILE at another file to swap them out
+THEMES = load_themes(os.environ.get("ANALYZE_THEMES_FILE", THEMES_FILE))
 
-    return theme_counts
+def theme_matrix(texts, n_jobs=ANALYSIS_JOBS):
+    """Counts theme keywords per document; returns (filenames, themes, documents x themes matrix)."""
+    detector = ThemeDetector(THEMES)
+    return list(texts), detector.themes, detector.count_matrix(texts.values(), n_jobs)
 
-theme_results = detect_themes(all_texts)
-
-print("\n🔥 **THEME ANALYSIS:** 🔥")
-for theme, count in theme_results.items():
-    print(f"{theme}: {count} mentions")
+def detect_themes(texts, n_jobs=ANALYSIS_JOBS):
+    """Scans texts and detects recurring queer themes based on keyword counts."""
+    detector = ThemeDetector(THEMES)
+    return detector.totals(detector.count_matrix(texts.values(), n_jobs))
 
 # 🔥 STEP 3: Extract Scandalous Passages
-def extract_passages(texts, keywords, num_passages=3):
-    """Finds and extracts juicy passages containing key words."""
-    extracted = {}
-
-    for filename, content in texts.items():
-        matches = []
-        lines = content.split(". ")  # Split text into sentences
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in keywords):
-                matches.append(line.strip())
-
-        if matches:
-            extracted[filename] = random.sample(matches, min(num_passages, len(matches)))
-
-    return extracted
-
-keywords = ["embrace", "passion", "longing", "lips", "touch", "scandal", "desire", "shame"]
-juicy_passages = extract_passages(all_texts, keywords)
-
-print("\n🔥 **SCANDALOUS PASSAGES FOUND:** 🔥")
-for file, passages in juicy_passages.items():
-    print(f"\n📖 **From {file}:**")
-    for passage in passages:
-        print(f"- {passage}")
+# Keywords live in passage_keywords.json; ANALYZE_SEED picks a different (but repeatable) sample
+PASSAGE_KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "passage_keywords.json")
+PASSAGE_SEED = int(os.environ.get("ANALYZE_SEED", "0"))
+
+def load_passage_keywords(path=PASSAGE_KEYWORDS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def extract_passages(texts, keywords, num_passages=3, seed=PASSAGE_SEED):
+    """Finds and extracts juicy passages containing key words, via the persistent passage index."""
+    from passage_index import PassageIndex
+    index = PassageIndex()
+    indexed = index.update(texts)  # Only new or changed documents get (re)indexed
+    print(f"🗂️ Passage index updated ({indexed} documents indexed)")
+    return index.extract_passages(keywords, num_passages, seed=seed, names=set(texts))
+
+def main():
+    """Loads the saved texts and runs every analysis step on them."""
+    # Every step is timed into a JSON run report under reports/ (INSTRUMENT_REPORTS=0 to skip),
+    # which is written even if a step fails
+    with instrumented_run("analyze"):
+        run_analysis()
+
+def run_analysis():
+    """The analysis steps themselves, each timed as a span of the current run."""
+    # Load all texts
+    with span("analyze.load_texts") as loading:
+        all_texts = load_texts(SINCE_RUN)
+        loading.add(docs=len(all_texts), bytes=sum(len(text) for text in all_texts.values()))
+    print(f"\n📂 Loaded {len(all_texts)} texts for analysis!\n")
+
+    with span("analyze.summarize_texts", n_jobs=ANALYSIS_JOBS) as summarizing:
+        summaries = summarize_texts(all_texts)
+        summarizing.add(docs=len(summaries))
+
+    print("\n📖 **Summaries of Texts:**")
+    for file, report in summaries.items():
+        if report["error"]:
+            print(f"\n📜 **{file} Summary:**\n(Could not summarize: {report['error']}) [{report['seconds']:.2f}s]\n")
+        else:
+            print(f"\n📜 **{file} Summary:**\n{report['summary']} [{report['seconds']:.2f}s]\n")
+
+    with span("analyze.detect_themes", n_jobs=ANALYSIS_JOBS) as detecting:
+        theme_results = detect_themes(all_texts)
+        detecting.add(docs=len(all_texts))
+
+    print("\n🔥 **THEME ANALYSIS:** 🔥")
+    for theme, count in theme_results.items():
+        print(f"{theme}: {count} mentions")
+
+    with span("analyze.extract_passages") as extracting:
+        juicy_passages = extract_passages(all_texts, load_passage_keywords())
+        extracting.add(docs=len(all_texts))
+
+    print("\n🔥 **SCANDALOUS PASSAGES FOUND:** 🔥")
+    for file, passages in juicy_passages.items():
+        print(f"\n📖 **From {file}:**")
+        for passage in passages:
+            print(f"- {passage}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+from itertools import accumulate
+from theme_detection import load_themes
+
+# 🧪 SYNTHETIC CORPORA
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSAGE_KEYWORDS_FILE = os.path.join(REPO_ROOT, "passage_keywords.json")
+SYLLABLES = ["ba", "ro", "mi", "ta", "len", "sor", "qui", "ve", "dan", "el", "os", "ur", "ny", "fa", "gre", "shi"]
+FUNCTION_WORDS = ["the", "of", "and", "a", "to", "in", "his", "her", "was", "that", "with", "for", "as", "he", "she"]
+KEYWORD_SHARE = 0.02  # Share of words drawn from the theme and passage keywords
+
+# Sizes per scale; books are generated to roughly book_megabytes each
+SCALES = {
+    "small": {"quotes": 500, "threads": 100, "comments_per_thread": 10, "books": 2, "book_megabytes": 0.5, "vocabulary": 5_000},
+    "medium": {"quotes": 5_000, "threads": 1_000, "comments_per_thread": 20, "books": 5, "book_megabytes": 2, "vocabulary": 20_000},
+    "large": {"quotes": 50_000, "threads": 10_000, "comments_per_thread": 30, "books": 10, "book_megabytes": 5, "vocabulary": 50_000},
+}
+
+class SyntheticCorpus:
+    """A reproducible corpus of quotes, Reddit-like threads and book-length texts.
+
+    Words follow a Zipf distribution over a generated vocabulary, with the real theme
+    and passage keywords mixed in, so theme counts, passage hits and summaries do
+    about as much work per byte as they would on real texts.
+    """
+
+    def __init__(self, scale="small", seed=0, **sizes):
+        self.sizes = {**SCALES[scale], **sizes}
+        self.seed = seed
+        rng = random.Random(seed)
+        words = set()
+        while len(words) < self.sizes["vocabulary"]:
+            words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+        self.words = FUNCTION_WORDS + sorted(words)
+        self._cum_weights = list(accumulate(1 / rank for rank in range(1, len(self.words) + 1)))
+        with open(PASSAGE_KEYWORDS_FILE, "r", encoding="utf-8") as f:
+            self.passage_keywords = json.load(f)
+        self.keywords = sorted({keyword for keywords in load_themes().values() for keyword in keywords}
+                               | set(self.passage_keywords))
+
+    def _rng(self, *parts):
+        return random.Random(":".join(map(str, (self.seed, *parts))))
+
+    def sentence(self, rng, min_words=6, max_words=24):
+        words = rng.choices(self.words, cum_weights=self._cum_weights, k=rng.randint(min_words, max_words))
+        for i in range(len(words)):
+            if rng.random() < KEYWORD_SHARE:
+                words[i] = rng.choice(self.keywords)
+        return " ".join(words).capitalize() + rng.choice(".....!?")
+
+    def paragraph(self, rng, sentences):
+        return " ".join(self.sentence(rng) for _ in range(sentences))
+
+    def quotes(self):
+        """Short quotes of one to three sentences."""
+        rng = self._rng("quotes")
+        return [self.paragraph(rng, rng.randint(1, 3)) for _ in range(self.sizes["quotes"])]
+
+    def threads(self):
+        """Reddit-like threads: {"id", "title", "selftext", "comments"}."""
+        rng = self._rng("threads")
+        return [{
+            "id": f"t{index:06d}",
+            "title": self.sentence(rng, 3, 10),
+            "selftext": self.paragraph(rng, rng.randint(1, 8)),
+            "comments": [self.paragraph(rng, rng.randint(1, 4)) for _ in range(self.sizes["comments_per_thread"])],
+        } for index in range(self.sizes["threads"])]
+
+    def book(self, index):
+        """One book of about book_megabytes, in paragraphs and chapters."""
+        rng = self._rng("book", index)
+        target = int(self.sizes["book_megabytes"] * 1024 * 1024)
+        parts, size, chapter = [], 0, 0
+        while size < target:
+            if not parts or rng.random() < 0.02:
+                chapter += 1
+                parts.append(f"CHAPTER {chapter}")
+            parts.append(self.paragraph(rng, rng.randint(3, 12)))
+            size += len(parts[-1]) + 2
+        return "\n\n".join(parts)
+
+    def books(self):
+        return [self.book(index) for index in range(self.sizes["books"])]
+
+    def thread_texts(self):
+        """Threads flattened the way fetch_reddit_texts stores them."""
+        return [thread["selftext"] + "\n".join(thread["comments"]) for thread in self.threads()]
+
+    def documents(self):
+        """Every document as a {name: text} dict, the shape analyze_texts works with."""
+        documents = {f"quote/{index}": text for index, text in enumerate(self.quotes())}
+        documents.update((f"reddit/{index}", text) for index, text in enumerate(self.thread_texts()))
+        documents.update((f"book/{index}", text) for index, text in enumerate(self.books()))
+        return documents
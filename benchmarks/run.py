@@ -0,0 +1,273 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from benchmarks.corpora import SyntheticCorpus, REPO_ROOT
+
+# ⏱️ BENCHMARK RUNNER
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+DEFAULT_REPEATS = 3
+DEFAULT_TOLERANCE = 0.20  # Slowdown (or memory growth) over the baseline that counts as a regression
+DEFAULT_LATENCY = 0.01  # Seconds the stand-in server waits before each response
+
+# 🔥 Analysis stages: each takes the synthetic corpus and returns {"docs", "bytes"} it processed
+def _size(texts):
+    return {"docs": len(texts), "bytes": sum(len(text.encode("utf-8")) for text in texts)}
+
+def bench_detect_themes(corpus, options):
+    from theme_detection import ThemeDetector, load_themes
+    texts = list(corpus.documents().values())
+    ThemeDetector(load_themes()).count_matrix(texts, options.jobs)
+    return _size(texts)
+
+def bench_extract_passages(corpus, options):
+    from passage_index import PassageIndex
+    documents = corpus.documents()
+    index = PassageIndex(os.path.join("cache", "passages.sqlite"))
+    index.update(documents)
+    index.extract_passages(corpus.passage_keywords, 3, names=set(documents))
+    index.close()
+    return _size(list(documents.values()))
+
+def bench_summarize_texts(corpus, options):
+    from summarization import summarize_documents
+    documents = corpus.documents()
+    summarize_documents(documents, n_sentences=3, n_jobs=options.jobs)
+    return _size(list(documents.values()))
+
+def bench_process_texts(corpus, options):
+    from text_processing import process_texts  # Needs the spaCy model
+    texts = list(corpus.documents().values())
+    process_texts(iter(texts), top_n=1000)
+    return _size(texts)
+
+# 🌐 Fetch stages: each runs a fetcher against the stand-in server, from a cold cache
+def bench_gutenberg(corpus, server, source):
+    paths = source.get_gutenberg_texts(["synthetic author"], [], output_dir=os.path.join("output", "gutenberg"))
+    return {"docs": len(paths), "bytes": sum(os.path.getsize(path) for path in paths)}
+
+def bench_internet_archive(corpus, server, source):
+    texts = source.get_internet_archive_texts("texts", "texts", "synthetic", "", limit=len(server.books))
+    return _size(texts)
+
+def bench_wikipedia(corpus, server, source):
+    return _size(source.fetch_wikipedia_texts(list(server.pages), api_url=f"{server.url}/w/api.php"))
+
+def bench_wikiquote(corpus, server, source):
+    quotes = source.get_wikiquote_quotes(list(server.pages), corpus.passage_keywords, api_url=f"{server.url}/w/api.php")
+    return _size(quotes)
+
+def bench_reddit(corpus, server, source):
+    texts = source.fetch_reddit_texts(["synthetic"], post_limit=len(server.threads),
+                                      comment_limit=corpus.sizes["comments_per_thread"], base_url=server.url,
+                                      requests_per_minute=600_000)
+    return _size(texts)
+
+def bench_wikidata(corpus, server, source):
+    items = source.get_wikidata_items(corpus.keywords + corpus.words[:1000], endpoint=f"{server.url}/sparql")
+    return _size([item["description"] for item in items])
+
+ANALYSIS_STAGES = {
+    "detect_themes": bench_detect_themes,
+    "extract_passages": bench_extract_passages,
+    "summarize_texts": bench_summarize_texts,
+    "process_texts": bench_process_texts,
+}
+FETCH_STAGES = {
+    "gutenberg": bench_gutenberg,
+    "internet_archive": bench_internet_archive,
+    "wikipedia": bench_wikipedia,
+    "wikiquote": bench_wikiquote,
+    "reddit": bench_reddit,
+    "wikidata": bench_wikidata,
+}
+STAGES = {**ANALYSIS_STAGES, **FETCH_STAGES}
+
+@contextmanager
+def fresh_workdir():
+    """Runs the block in an empty temporary directory, so every cache and index starts cold."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(previous)
+
+def run_once(name, corpus, options):
+    """Runs one stage once in a fresh working directory; returns (seconds, units, server requests)."""
+    from http_session import configure_cache
+
+    with fresh_workdir():
+        configure_cache(os.path.join("cache", "http"))
+        if name in ANALYSIS_STAGES:
+            start = time.perf_counter()
+            units = ANALYSIS_STAGES[name](corpus, options)
+            return time.perf_counter() - start, units, {}
+
+        from fetch_orchestrator import configure_host_limits
+        from benchmarks.stand_ins import StandInServer, patched_sources
+        configure_host_limits({}, options.concurrency)
+        with StandInServer(corpus, options.latency) as server, patched_sources(server) as source:
+            start = time.perf_counter()
+            units = FETCH_STAGES[name](corpus, server, source)
+            return time.perf_counter() - start, units, dict(server.requests)
+
+def measure(name, options):
+    """Times a stage over options.repeats runs, then runs it once more under tracemalloc for peak memory."""
+    corpus = SyntheticCorpus(options.scale, seed=options.seed)
+    seconds = []
+    for _ in range(options.repeats):
+        elapsed, units, requests = run_once(name, corpus, options)
+        seconds.append(elapsed)
+
+    tracemalloc.start()
+    run_once(name, corpus, options)
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(seconds)
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "seconds": {"min": min(seconds), "median": median, "max": max(seconds), "runs": seconds},
+        "docs": units["docs"],
+        "bytes": units["bytes"],
+        "docs_per_second": units["docs"] / median if median else None,
+        "megabytes_per_second": units["bytes"] / 1024 / 1024 / median if median else None,
+        "peak_python_megabytes": peak_python / 1024 / 1024,
+        "peak_rss_megabytes": rss_kb / (1024 * 1024 if sys.platform == "darwin" else 1024),  # bytes on macOS
+        "requests": requests,
+    }
+
+def run_isolated(name, options):
+    """Runs one stage in a child process, so its peak RSS is its own; returns its result or an error."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", name, "--worker-output", output,
+               "--scale", options.scale, "--seed", str(options.seed), "--repeats", str(options.repeats),
+               "--jobs", str(options.jobs), "--latency", str(options.latency), "--concurrency", str(options.concurrency)]
+    try:
+        process = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        if process.returncode != 0:
+            return {"error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit {process.returncode}"}
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+# 📈 Results and regressions
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def latest_results(scale, exclude=None):
+    """Returns the path of the newest saved results file for a scale, or None."""
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        if path == exclude:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            if json.load(f).get("scale") == scale:
+                return path
+    return None
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns {stage: [messages]} for stages that got slower or hungrier than the baseline by more than tolerance."""
+    regressions = {}
+    for stage, current in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        checks = {
+            "median time": (current["seconds"]["median"], previous["seconds"]["median"]),
+            "peak Python memory": (current["peak_python_megabytes"], previous["peak_python_megabytes"]),
+        }
+        for label, (now, before) in checks.items():
+            if before and now > before * (1 + tolerance):
+                regressions.setdefault(stage, []).append(f"{label} {before:.3f} -> {now:.3f} ({now / before - 1:+.0%})")
+    return regressions
+
+def print_results(results):
+    print(f"\n⏱️ Benchmarks ({results['scale']}, commit {results['git_commit']}):")
+    for stage, result in results["stages"].items():
+        if "error" in result:
+            print(f"   {stage:<18} skipped: {result['error']}")
+            continue
+        print(f"   {stage:<18} {result['seconds']['median']:8.3f}s  {result['docs_per_second']:10.1f} docs/s  "
+              f"{result['megabytes_per_second']:8.2f} MB/s  peak {result['peak_python_megabytes']:8.1f} MB py / "
+              f"{result['peak_rss_megabytes']:8.1f} MB rss")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis stages and fetchers on synthetic data.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to run (default: all): {', '.join(STAGES)}")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for stages that support them")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Stand-in server delay per response")
+    parser.add_argument("--concurrency", type=int, default=4, help="Per-host request limit for fetch stages")
+    parser.add_argument("--baseline", help="Results file to compare against (default: the newest one for this scale)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+    unknown = [stage for stage in options.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    if options.worker:
+        with open(options.worker_output, "w", encoding="utf-8") as f:
+            json.dump(measure(options.worker, options), f)
+        return 0
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": options.scale,
+        "sizes": SyntheticCorpus(options.scale, seed=options.seed).sizes,
+        "repeats": options.repeats,
+        "stages": {},
+    }
+    for stage in options.stages or list(STAGES):
+        print(f"⏱️ {stage}...")
+        results["stages"][stage] = run_isolated(stage, options)
+    print_results(results)
+
+    path = None
+    if not options.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{options.scale}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {os.path.relpath(path, REPO_ROOT)}")
+
+    baseline_path = options.baseline or latest_results(options.scale, exclude=path)
+    if not baseline_path:
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), options.tolerance)
+    print(f"\n📈 Compared with {os.path.relpath(baseline_path, REPO_ROOT)}:")
+    if not regressions:
+        print("   No regressions.")
+    for stage, messages in regressions.items():
+        for message in messages:
+            print(f"   ⚠️ {stage}: {message}")
+    return 1 if regressions and options.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+# 🎭 LOCAL HTTP STAND-INS
+GUTENBERG_HEADER = "The Project Gutenberg eBook of {title}\n\n*** START OF THE PROJECT GUTENBERG EBOOK {title} ***\n\n"
+GUTENBERG_FOOTER = "\n\n*** END OF THE PROJECT GUTENBERG EBOOK {title} ***\n\nLicense boilerplate.\n"
+SPARQL_VALUE = re.compile(r'"((?:[^"\\]|\\.)*)"@en')
+RATE_LIMIT_REMAINING = 100_000  # Quota reported in X-Ratelimit-* headers; generous, so fetchers aren't throttled
+RATE_LIMIT_RESET = 60
+
+class StandInServer:
+    """A local ThreadingHTTPServer that replays canned responses for every source we fetch from.
+
+    It speaks just enough of each API for the fetchers in data_acquisition:
+      /ebooks/search/, /cache/epub/<id>/pg<id>.txt     Gutenberg search and books (with ETags)
+      /download/<identifier>/<name>                    Internet Archive text files
+      /w/api.php                                       MediaWiki info and revisions queries
+      /r/<name>/hot.json, /comments/<id>.json          Reddit listings and comments
+      /sparql                                          Wikidata SPARQL (POST)
+    Every response is delayed by `latency` seconds to stand in for the network, and
+    requests are counted per route.
+    """
+
+    def __init__(self, corpus, latency=0.0):
+        self.latency = latency
+        self.requests = Counter()
+        self.books = {str(1000 + index): (f"Synthetic Book {index}", text) for index, text in enumerate(corpus.books())}
+        self.threads = corpus.threads()
+        quotes = corpus.quotes()
+        per_page = max(1, len(quotes) // 10)
+        self.pages = {
+            f"Page {index}": (index + 1, "\n".join(f"* {quote}\n** Source {index}" for quote in quotes[start:start + per_page]))
+            for index, start in enumerate(range(0, len(quotes), per_page))
+        }
+        self.labels = set(corpus.keywords)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # 🔀 Routes
+    def gutenberg_search(self, query):
+        links = "".join(f'<li class="booklink"><a class="link" href="/ebooks/{book_id}">{escape(title)}</a></li>'
+                        for book_id, (title, _) in self.books.items())
+        return 200, "text/html", f"<ul>{links}</ul>"
+
+    def gutenberg_book(self, book_id):
+        title, text = self.books[book_id]
+        return 200, "text/plain; charset=utf-8", GUTENBERG_HEADER.format(title=title) + text + GUTENBERG_FOOTER.format(title=title)
+
+    def archive_file(self, identifier):
+        _, text = self.books[identifier.rsplit("_", 1)[-1]]
+        return 200, "text/plain; charset=utf-8", text
+
+    def mediawiki(self, query):
+        if "titles" in query:
+            pages = [{"pageid": self.pages[title][0], "title": title, "lastrevid": self.pages[title][0]}
+                     if title in self.pages else {"title": title, "missing": True}
+                     for title in query["titles"].split("|")]
+        else:
+            ids = set(map(int, query["pageids"].split("|")))
+            pages = [{"pageid": pageid, "title": title,
+                      "revisions": [{"revid": pageid, "slots": {"main": {"content": wikitext}}}]}
+                     for title, (pageid, wikitext) in self.pages.items() if pageid in ids]
+        return 200, "application/json", json.dumps({"query": {"pages": pages}})
+
+    def reddit_listing(self, query):
+        start = int(query.get("after") or 0)
+        end = min(start + int(query.get("limit", 25)), len(self.threads))
+        children = [{"kind": "t3", "data": {"id": thread["id"], "title": thread["title"], "selftext": thread["selftext"],
+                                            "permalink": f"/r/synthetic/comments/{thread['id']}/"}}
+                    for thread in self.threads[start:end]]
+        return 200, "application/json", json.dumps({"data": {"children": children, "after": str(end) if end < len(self.threads) else None}})
+
+    def reddit_comments(self, post_id, query):
+        thread = next(thread for thread in self.threads if thread["id"] == post_id)
+        limit = int(query.get("limit", 200))
+        children = [{"kind": "t1", "data": {"body": body}} for body in thread["comments"][:limit]]
+        return 200, "application/json", json.dumps([{}, {"data": {"children": children}}])
+
+    def sparql(self, sparql_query):
+        bindings = [{"label": {"value": label}, "item": {"value": f"http://www.wikidata.org/entity/Q{index}"},
+                     "itemLabel": {"value": label}, "description": {"value": f"synthetic entry for {label}"}}
+                    for index, label in enumerate(SPARQL_VALUE.findall(sparql_query)) if label in self.labels]
+        return 200, "application/sparql-results+json", json.dumps({"results": {"bindings": bindings}})
+
+    def route(self, method, path, query, body):
+        parts = path.strip("/").split("/")
+        if path.startswith("/ebooks/search"):
+            return "gutenberg_search", self.gutenberg_search(query.get("query", ""))
+        if path.startswith("/cache/epub/"):
+            return "gutenberg_book", self.gutenberg_book(parts[2])
+        if path.startswith("/download/"):
+            return "archive_file", self.archive_file(parts[1])
+        if path == "/w/api.php":
+            return "mediawiki", self.mediawiki(query)
+        if path.startswith("/r/"):
+            return "reddit_listing", self.reddit_listing(query)
+        if path.startswith("/comments/"):
+            return "reddit_comments", self.reddit_comments(parts[1].removesuffix(".json"), query)
+        if path == "/sparql" and method == "POST":
+            return "sparql", self.sparql({k: v[0] for k, v in parse_qs(body).items()}["query"])
+        return "not_found", (404, "text/plain", "not found")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                route, (status, content_type, text) = server.route(method, url.path, query, body)
+                server.requests[route] += 1
+                time.sleep(server.latency)
+
+                payload = text.encode("utf-8")
+                etag = '"' + hashlib.sha256(payload).hexdigest()[:16] + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, payload = 304, b""
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("ETag", etag)
+                self.send_header("X-Ratelimit-Remaining", str(RATE_LIMIT_REMAINING))
+                self.send_header("X-Ratelimit-Reset", str(RATE_LIMIT_RESET))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+        return Handler
+
+    # 📜 The Internet Archive client library does its own HTTP, so its item lookups are
+    # replaced with canned items whose files download from this server
+    def archive_api(self):
+        def search_items(query, fields=None):
+            return [{"identifier": f"synthetic_{book_id}"} for book_id in self.books]
+
+        def get_item(identifier):
+            self.requests["archive_metadata"] += 1
+            title, _ = self.books[identifier.rsplit("_", 1)[-1]]
+            text_file = SimpleNamespace(name=f"{identifier}.txt", format="Text",
+                                        url=f"{self.url}/download/{identifier}/{identifier}.txt")
+            return SimpleNamespace(metadata={"title": title}, get_files=lambda formats=None: [text_file])
+
+        return SimpleNamespace(search_items=search_items, get_item=get_item)
+
+@contextmanager
+def patched_sources(server):
+    """Points the module-level Gutenberg URLs and the Internet Archive client at the stand-in server."""
+    import data_acquisition
+
+    saved = {name: getattr(data_acquisition, name) for name in ("GUTENBERG_SEARCH_URL", "GUTENBERG_BASE_URL", "ia")}
+    data_acquisition.GUTENBERG_SEARCH_URL = f"{server.url}/ebooks/search/?query={{}}&submit_search=Go%21"
+    data_acquisition.GUTENBERG_BASE_URL = server.url
+    data_acquisition.ia = server.archive_api()
+    try:
+        yield data_acquisition
+    finally:
+        for name, value in saved.items():
+            setattr(data_acquisition, name, value)
@@ -0,0 +1,267 @@
+import json
+import os
+import re
+import numpy as np
+from scipy import sparse
+from scipy.special import xlogy
+from scipy.stats import rankdata
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer, ENGLISH_STOP_WORDS
+from theme_detection import TOKEN_PATTERN
+from utils import PARAGRAPH_BREAK, SENTENCE_BREAK
+
+# ⛏️ LEXICON CANDIDATE MINING
+DEFAULT_NGRAM_RANGE = (1, 2)  # Single words and two-word collocations
+DEFAULT_MIN_DF = 2  # Terms must appear in at least this many documents
+DEFAULT_MAX_DF = 0.95  # ...and in at most this share of them
+DEFAULT_MAX_FEATURES = 50_000  # Vocabulary cap; also bounds the term x term matrix
+DEFAULT_MIN_COOCCURRENCE = 2  # Sentences two words must share before their PMI counts
+DEFAULT_MAX_PMI_WORDS = 10_000  # Most frequent single words scored by co-occurrence; bounds the word x word matrix
+SENTENCE_BATCH = 10_000  # Sentences per block when hashing them and when summing co-occurrence counts
+HASH_FEATURES = 2 ** 22  # Hashed word columns of the sentence matrix (collisions are negligible at this size)
+UNIT_BREAK = re.compile(f"{SENTENCE_BREAK.pattern}|{PARAGRAPH_BREAK.pattern}")
+DEFAULT_TOP_N = 500
+G2_CRITICAL = 3.84  # Log-likelihood for p < 0.05 with one degree of freedom
+
+class CandidateMiner:
+    """Scores corpus terms as lexicon candidates from sparse count matrices.
+
+    Fitting builds a documents x terms count matrix (words and n-grams) in one pass over
+    the texts. Each term then gets three scores, all computed on whole arrays:
+      tfidf  summed sublinear TF-IDF weight across documents
+      pmi    for n-grams, how much more often the words occur together than chance;
+             for single words, their strongest sentence co-occurrence PMI with another word
+             (only the max_pmi_words most frequent words; the rest score lowest)
+      g2     signed log-likelihood of the term's frequency against a background corpus
+             (positive when it is over-represented here)
+    Candidates are ranked by the mean of their percentile ranks on each score.
+
+    Co-occurrence is counted within sentences rather than documents: in book-length
+    documents nearly every pair of words co-occurs, which makes a document-level
+    word x word matrix practically dense. The same pass over the texts hashes each
+    sentence's words into a sparse sentences x words 0/1 matrix for it.
+    """
+
+    def __init__(self, ngram_range=DEFAULT_NGRAM_RANGE, min_df=DEFAULT_MIN_DF, max_df=DEFAULT_MAX_DF,
+                 max_features=DEFAULT_MAX_FEATURES, min_cooccurrence=DEFAULT_MIN_COOCCURRENCE,
+                 max_pmi_words=DEFAULT_MAX_PMI_WORDS):
+        self.ngram_range = ngram_range
+        self.min_df = min_df
+        self.max_df = max_df
+        self.max_features = max_features
+        self.min_cooccurrence = min_cooccurrence
+        self.max_pmi_words = max_pmi_words
+        self.terms = None
+        self.counts = None
+        self.sentences = None
+        self._hasher = HashingVectorizer(token_pattern=TOKEN_PATTERN.pattern, lowercase=True, n_features=HASH_FEATURES,
+                                         binary=True, alternate_sign=False, norm=None, dtype=np.float32)
+
+    def _vectorizer(self, **options):
+        return CountVectorizer(token_pattern=TOKEN_PATTERN.pattern, lowercase=True,
+                               ngram_range=self.ngram_range, dtype=np.int64, **options)
+
+    def fit(self, texts):
+        """Counts every term of an iterable of texts, and which words each sentence holds; returns self."""
+        blocks, pending = [], []
+
+        def hash_sentences():
+            blocks.append(self._hasher.transform(pending).astype(np.int8))
+            pending.clear()
+
+        def documents():
+            for text in texts:
+                pending.extend(UNIT_BREAK.split(text))
+                if len(pending) >= SENTENCE_BATCH:
+                    hash_sentences()
+                yield text
+            if pending:
+                hash_sentences()
+
+        vectorizer = self._vectorizer(min_df=self.min_df, max_df=self.max_df, max_features=self.max_features)
+        self.counts = vectorizer.fit_transform(documents()).tocsc()
+        self.sentences = sparse.vstack(blocks).tocsc() if blocks else sparse.csc_matrix((0, HASH_FEATURES), dtype=np.int8)
+        self.terms = vectorizer.get_feature_names_out().astype(str)
+        self._words = np.char.count(self.terms, " ") + 1
+        return self
+
+    # 📊 Matrices
+    def incidence(self):
+        """Documents x terms 0/1 matrix."""
+        incidence = self.counts.copy()
+        incidence.data[:] = 1
+        return incidence
+
+    def sentence_incidence(self, columns):
+        """Sentences x words 0/1 matrix for the single-word terms at `columns`."""
+        hashed = self._hasher.transform(self.terms[columns]).tocsr()
+        hashed.sort_indices()
+        return self.sentences[:, hashed.indices].astype(np.int32).tocsr()
+
+    def cooccurrence(self, columns):
+        """Words x words matrix of how many sentences each pair of the single-word terms at `columns` shares (COO).
+
+        Summed over blocks of SENTENCE_BATCH sentences, so no intermediate product is
+        larger than the final one.
+        """
+        incidence = self.sentence_incidence(columns)
+        shared = sparse.csr_matrix((len(columns), len(columns)), dtype=np.int32)
+        for start in range(0, incidence.shape[0], SENTENCE_BATCH):
+            block = incidence[start:start + SENTENCE_BATCH]
+            shared = shared + block.T @ block
+        return shared.tocoo()
+
+    # 🧮 Scores
+    def _constituents(self, n):
+        """Column of each word of the n-word terms (-1 where a word was pruned from the vocabulary)."""
+        unigrams = np.flatnonzero(self._words == 1)  # Feature names are sorted, so these are too
+        rest = self.terms[self._words == n]
+        if not len(unigrams):  # e.g. ngram_range=(2, 2), or max_features pruned every single word
+            return np.full((n, len(rest)), -1)
+        columns = []
+        for _ in range(n):
+            word, _, rest = np.char.partition(rest, " ").T
+            found = np.searchsorted(self.terms[unigrams], word).clip(max=len(unigrams) - 1)
+            columns.append(np.where(self.terms[unigrams][found] == word, unigrams[found], -1))
+        return np.array(columns)
+
+    def tfidf(self):
+        weights = TfidfTransformer(sublinear_tf=True).fit_transform(self.counts)
+        return np.asarray(weights.sum(axis=0)).ravel()
+
+    def pmi(self):
+        frequencies = np.asarray(self.counts.sum(axis=0)).ravel().astype(float)
+        scores = np.full(len(self.terms), -np.inf)
+
+        # Collocations: log p(w1 w2 ...) / (p(w1) p(w2) ...), each order against its own total
+        unigram_total = frequencies[self._words == 1].sum()
+        for n in range(2, self.ngram_range[1] + 1):
+            ngrams = np.flatnonzero(self._words == n)
+            if not len(ngrams):
+                continue
+            columns = self._constituents(n)
+            known = (columns >= 0).all(axis=0)
+            if not known.any():
+                continue  # Leaves them at -inf, like any n-gram whose words were pruned
+            word_probabilities = frequencies[columns.clip(min=0)] / unigram_total
+            ngram_probabilities = frequencies[ngrams] / frequencies[ngrams].sum()
+            scores[ngrams[known]] = np.log(ngram_probabilities[known]) - np.log(word_probabilities[:, known]).sum(axis=0)
+
+        # Single words: strongest sentence-level PMI with any other of the most frequent words
+        unigrams = np.flatnonzero(self._words == 1)
+        scored = np.sort(unigrams[np.argsort(-frequencies[unigrams], kind="stable")[:self.max_pmi_words]])
+        if len(scored) and self.sentences.shape[0]:
+            shared = self.cooccurrence(scored)
+            keep = (shared.row != shared.col) & (shared.data >= self.min_cooccurrence)
+            rows, cols, together = shared.row[keep], shared.col[keep], shared.data[keep].astype(float)
+            sentence_frequency = shared.diagonal().astype(float)
+            pair_pmi = np.log(self.sentences.shape[0] * together / (sentence_frequency[rows] * sentence_frequency[cols]))
+            strongest = np.full(len(scored), -np.inf)
+            np.maximum.at(strongest, rows, pair_pmi)
+            scores[scored] = strongest
+        return scores
+
+    def background_counts(self, background):
+        """Aligns a background corpus with the fitted terms; returns (counts, total words).
+
+        `background` is a {term: count} dict (e.g. a frequencies table) or an iterable
+        of texts, which is counted with the same tokenization as the corpus.
+        """
+        if isinstance(background, dict):
+            counts = np.fromiter((background.get(term, 0) for term in self.terms), dtype=float, count=len(self.terms))
+            total = sum(count for term, count in background.items() if " " not in term)
+        else:
+            matrix = self._vectorizer(vocabulary=self.terms).transform(background)
+            counts = np.asarray(matrix.sum(axis=0)).ravel().astype(float)
+            total = counts[self._words == 1].sum()
+        return counts, float(total)
+
+    def g2(self, background):
+        """Signed log-likelihood (G²) of each term's corpus frequency against the background."""
+        k1 = np.asarray(self.counts.sum(axis=0)).ravel().astype(float)
+        n1 = k1[self._words == 1].sum()
+        k2, n2 = self.background_counts(background)
+        n2 = max(n2, k2.max(initial=0))
+
+        # 2x2 contingency table: (term, other words) x (corpus, background)
+        observed = np.array([k1, k2, n1 - k1, n2 - k2]).clip(min=0)
+        share = (k1 + k2) / (n1 + n2)
+        expected = np.array([n1 * share, n2 * share, n1 * (1 - share), n2 * (1 - share)])
+        g2 = 2 * (xlogy(observed, observed) - xlogy(observed, expected)).sum(axis=0)
+        return np.where(k1 / max(n1, 1) >= k2 / max(n2, 1), g2, -g2)
+
+    def scores(self, background=None):
+        """Returns {"tfidf", "pmi", "g2"} arrays aligned with self.terms (g2 only with a background)."""
+        scores = {"tfidf": self.tfidf(), "pmi": self.pmi()}
+        if background is not None:
+            scores["g2"] = self.g2(background)
+        return scores
+
+    # 🏆 Ranking
+    def rank(self, background=None, top_n=DEFAULT_TOP_N, min_g2=G2_CRITICAL, exclude=()):
+        """Returns the best candidates as a {term: corpus count} dict, best first.
+
+        Terms made only of stop words or digits are dropped, as are terms in `exclude`
+        and, given a background, terms not over-represented at the min_g2 level.
+        """
+        scores = self.scores(background)
+        keep = ~self._is_noise() & ~np.isin(self.terms, list(exclude))
+        if "g2" in scores:
+            keep &= scores["g2"] >= min_g2
+        ranks = np.mean([rankdata(np.nan_to_num(score, nan=-np.inf, posinf=np.inf)) for score in scores.values()], axis=0)
+
+        candidates = np.flatnonzero(keep)
+        best = candidates[np.argsort(-ranks[candidates], kind="stable")][:top_n]
+        frequencies = np.asarray(self.counts.sum(axis=0)).ravel()
+        return {str(self.terms[i]): int(frequencies[i]) for i in best}
+
+    def _is_noise(self):
+        noise = np.zeros(len(self.terms), dtype=bool)
+        stop_words = np.array(sorted(ENGLISH_STOP_WORDS))
+        rest = self.terms
+        for _ in range(self.ngram_range[1]):
+            word, _, rest = np.char.partition(rest, " ").T
+            present = word != ""
+            noise |= present & (np.isin(word, stop_words) | np.char.isdigit(word) | (np.char.str_len(word) < 2))
+        return noise
+
+def known_terms(terms, existing_lexicon):
+    """Returns which of the terms are already in a lexicon dict or LexiconStore."""
+    if hasattr(existing_lexicon, "get_many"):
+        return set(existing_lexicon.get_many(terms))
+    return {term for term in terms if term in existing_lexicon}
+
+def mine_candidates(texts, background=None, existing_lexicon=None, top_n=DEFAULT_TOP_N, **miner_options):
+    """Ranks lexicon candidates from texts; returns {term: count}, best first, ready for generate_lexicon.
+
+    Terms already in existing_lexicon (a dict or LexiconStore) are left out, so review
+    time only goes to new terms.
+    """
+    miner = CandidateMiner(**miner_options).fit(texts)
+    exclude = known_terms(list(miner.terms), existing_lexicon) if existing_lexicon is not None else ()
+    return miner.rank(background, top_n=top_n, exclude=exclude)
+
+def load_background(path):
+    """Loads background term counts from a {term: count} JSON file or an exported frequencies table."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    from columnar_export import load_table
+    table = load_table(path, columns=["term", "count"])
+    return dict(zip(table.column("term").to_pylist(), table.column("count").to_pylist()))
+
+if __name__ == "__main__":
+    from corpus_store import CorpusStore, CORPUS_FOLDER
+    from lexicon import generate_lexicon, open_lexicon
+
+    # Set MINING_BACKGROUND to a frequencies file of general English to rank by log-likelihood too
+    background_path = os.environ.get("MINING_BACKGROUND")
+    store = CorpusStore(CORPUS_FOLDER)
+    lexicon = open_lexicon()
+    candidates = mine_candidates(
+        (store.read(entry["hash"]) for entry in store.documents()),
+        background=load_background(background_path) if background_path else None,
+        existing_lexicon=lexicon,
+    )
+    print(f"⛏️ {len(candidates)} candidate terms to review")
+    generate_lexicon(candidates, lexicon)
+    lexicon.close()
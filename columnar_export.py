@@ -0,0 +1,159 @@
+import os
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from corpus_store import CorpusStore, CORPUS_FOLDER
+from text_processing import iter_keyword_rows, process_texts
+
+# 🧱 COLUMNAR EXPORT (PARQUET / ARROW)
+COLUMNAR_FOLDER = "columnar"
+ROW_GROUP_SIZE = 10_000  # Rows buffered before a row group (or IPC batch) is written
+MAX_BUFFERED_BYTES = 64 * 1024 * 1024  # Flush early when buffered document text gets this big
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+DOCUMENTS_SCHEMA = pa.schema([
+    ("hash", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("url", pa.string()),
+    ("fetched_at", pa.string()),
+    ("run_id", pa.string()),
+    ("text", pa.large_string()),
+])
+
+TERMS_SCHEMA = pa.schema([
+    ("doc_hash", pa.string()),
+    ("term", pa.string()),
+    ("kind", pa.string()),
+    ("pos", pa.string()),
+    ("tones", pa.list_(pa.string())),
+    ("count", pa.int64()),
+])
+
+FREQUENCIES_SCHEMA = pa.schema([
+    ("term", pa.string()),
+    ("count", pa.int64()),
+])
+
+class TableWriter:
+    """Writes rows to a Parquet file, or an Arrow IPC file for .arrow/.feather/.ipc paths.
+
+    Rows are buffered and written one row group at a time, so exports never hold more
+    than ROW_GROUP_SIZE rows (or MAX_BUFFERED_BYTES of text) in memory. Arrow IPC files
+    are left uncompressed so load_table can memory-map them without copying.
+    """
+
+    def __init__(self, path, schema, row_group_size=ROW_GROUP_SIZE):
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._columns = {name: [] for name in schema.names}
+        self._buffered = 0
+        self._buffered_bytes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._tmp_path = f"{path}.tmp"
+        if path.endswith(ARROW_EXTENSIONS):
+            self._writer = pa.ipc.new_file(self._tmp_path, schema)
+        else:
+            self._writer = pq.ParquetWriter(self._tmp_path, schema, compression="zstd")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._writer.close()
+            os.remove(self._tmp_path)
+
+    def write(self, row):
+        """Buffers one row (a dict keyed by column name)."""
+        for name, values in self._columns.items():
+            value = row.get(name)
+            values.append(value)
+            if isinstance(value, str):
+                self._buffered_bytes += len(value)
+        self._buffered += 1
+        if self._buffered >= self.row_group_size or self._buffered_bytes >= MAX_BUFFERED_BYTES:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffered:
+            return
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        if isinstance(self._writer, pq.ParquetWriter):
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_batch(batch)
+        self.rows_written += self._buffered
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        self._buffered_bytes = 0
+
+    def close(self):
+        """Writes any buffered rows and moves the finished file into place."""
+        self._flush()
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+def export_documents(store, path, since_run=None, source=None):
+    """Writes the store's documents (metadata and text) to path; returns the number of rows."""
+    with TableWriter(path, DOCUMENTS_SCHEMA, row_group_size=ROW_GROUP_SIZE // 10) as writer:
+        for entry in store.documents(since_run=since_run, source=source):
+            writer.write({**entry, "text": store.read(entry["hash"])})
+    return writer.rows_written
+
+def export_terms(texts, path, category_name="General", cache=None, **pipeline_options):
+    """Writes the extracted terms of each text, one row per (document, term, kind, pos, tones).
+
+    `texts` is any iterable of strings; rows are keyed by the document hash, which is
+    also the corpus store's key, so the table joins with an exported documents table.
+    pipeline_options (outputs, batch_size, n_process, max_chars) go to iter_keyword_rows.
+    """
+    with TableWriter(path, TERMS_SCHEMA) as writer:
+        for doc_hash, rows in iter_keyword_rows(texts, category_name, cache=cache, **pipeline_options):
+            for term, kind, pos, tones, count in rows:
+                writer.write({"doc_hash": doc_hash, "term": term, "kind": kind, "pos": pos,
+                              "tones": tones, "count": count})
+    return writer.rows_written
+
+def export_frequencies(counts, path):
+    """Writes a {term: count} dict (e.g. process_texts output) or (term, count) pairs to path."""
+    items = counts.items() if isinstance(counts, dict) else counts
+    with TableWriter(path, FREQUENCIES_SCHEMA) as writer:
+        for term, count in items:
+            writer.write({"term": term, "count": count})
+    return writer.rows_written
+
+def load_table(path, columns=None, filter=None):
+    """Loads an exported table, reading only the requested columns.
+
+    Arrow IPC files are memory-mapped, so loading them copies nothing; Parquet files
+    are memory-mapped and only the projected column chunks are decoded. A directory is
+    read as one dataset of all the files in it (e.g. one documents file per run).
+    `filter` is a pyarrow.compute expression, e.g. pc.field("source") == "gutenberg".
+    """
+    if os.path.isdir(path):
+        fmt = "ipc" if any(name.endswith(ARROW_EXTENSIONS) for name in os.listdir(path)) else "parquet"
+        return ds.dataset(path, format=fmt).to_table(columns=columns, filter=filter)
+    if path.endswith(ARROW_EXTENSIONS):
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.filter(filter) if filter is not None else table
+    return pq.read_table(path, columns=columns, filters=filter, memory_map=True)
+
+def columnar_path(directory, table, name, fmt="parquet"):
+    """Returns where an export goes: <directory>/<table>/<name>.<parquet|arrow>."""
+    return os.path.join(directory, table, f"{name}.{'arrow' if fmt == 'arrow' else 'parquet'}")
+
+if __name__ == "__main__":
+    # Export the whole corpus store and its term frequencies
+    store = CorpusStore(CORPUS_FOLDER)
+    rows = export_documents(store, columnar_path(COLUMNAR_FOLDER, "documents", "all"))
+    print(f"🧱 Exported {rows} documents to {COLUMNAR_FOLDER}/documents/all.parquet")
+
+    texts = (store.read(entry["hash"]) for entry in store.documents())
+    rows = export_frequencies(process_texts(texts), columnar_path(COLUMNAR_FOLDER, "frequencies", "all"))
+    print(f"🧱 Exported {rows} term frequencies to {COLUMNAR_FOLDER}/frequencies/all.parquet")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+# 🗄️ CONTENT-ADDRESSED CORPUS STORE
+CORPUS_FOLDER = "corpus"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class CorpusStore:
+    """Keeps every fetched document exactly once, under the SHA-256 of its text.
+
+    Layout under root:
+      documents/<ab>/<hash>.txt  the document text
+      manifest.jsonl             one line per (document, URL) sighting: hash, source,
+                                 title, url, fetched_at and the run that added it
+      runs.jsonl                 one line per collection run, in order
+
+    The first manifest line for a hash is the document's own record; later lines for
+    the same hash only note another URL it was seen at, so fetchers can skip it.
+    """
+
+    def __init__(self, root=CORPUS_FOLDER):
+        self.root = root
+        self.documents_dir = os.path.join(root, "documents")
+        self.manifest_path = os.path.join(root, "manifest.jsonl")
+        self.runs_path = os.path.join(root, "runs.jsonl")
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._urls = set()
+        self._runs = []
+        os.makedirs(self.documents_dir, exist_ok=True)
+
+        for entry in _read_jsonl(self.manifest_path):
+            self._entries.setdefault(entry["hash"], entry)
+            if entry.get("url"):
+                self._urls.add(entry["url"])
+        self._runs = [run["run_id"] for run in _read_jsonl(self.runs_path)]
+
+    # 🏃 Runs
+    def start_run(self):
+        """Opens a new collection run; documents added from now on are tagged with it."""
+        run_id = time.strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        while run_id in self._runs:
+            suffix += 1
+            run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        with self._lock:
+            self._runs.append(run_id)
+            _append_jsonl(self.runs_path, {"run_id": run_id, "started_at": _now()})
+        self.run_id = run_id
+        return run_id
+
+    def runs(self):
+        """Returns all run IDs, oldest first."""
+        return list(self._runs)
+
+    # 🔎 Lookups
+    def has_url(self, url):
+        return url in self._urls
+
+    def has_hash(self, doc_hash):
+        return doc_hash in self._entries
+
+    def path(self, doc_hash):
+        return os.path.join(self.documents_dir, doc_hash[:2], f"{doc_hash}.txt")
+
+    def read(self, doc_hash):
+        with open(self.path(doc_hash), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def documents(self, since_run=None, source=None):
+        """Returns manifest entries, optionally only those added after run `since_run`."""
+        if since_run is not None and since_run not in self._runs:
+            raise ValueError(f"Unknown run '{since_run}'")
+        newer_runs = set(self._runs[self._runs.index(since_run) + 1:]) if since_run else None
+        return [entry for entry in self._entries.values()
+                if (newer_runs is None or entry["run_id"] in newer_runs)
+                and (source is None or entry["source"] == source)]
+
+    # 💾 Writes
+    def add_text(self, source, text, title=None, url=None):
+        """Stores a document from memory. Returns (hash, is_new)."""
+        doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if not self.has_hash(doc_hash):
+            tmp_path = self._tmp_path(doc_hash)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self._doc_path(doc_hash))
+        return doc_hash, self._record(doc_hash, source, title, url)
+
+    def add_file(self, source, file_path, title=None, url=None):
+        """Moves a downloaded file into the store, hashing it in chunks. Returns (hash, is_new)."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        doc_hash = digest.hexdigest()
+        if self.has_hash(doc_hash):
+            os.remove(file_path)
+        else:
+            shutil.move(file_path, self._doc_path(doc_hash))
+        return doc_hash, self._record(doc_hash, source, title, url)
+
+    def _doc_path(self, doc_hash):
+        path = self.path(doc_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _tmp_path(self, doc_hash):
+        return f"{self._doc_path(doc_hash)}.{threading.get_ident()}.tmp"
+
+    def _record(self, doc_hash, source, title, url):
+        with self._lock:
+            is_new = doc_hash not in self._entries
+            if not is_new and (not url or url in self._urls):
+                return False
+            entry = {"hash": doc_hash, "source": source, "title": title, "url": url,
+                     "fetched_at": _now(), "run_id": self.run_id}
+            _append_jsonl(self.manifest_path, entry)
+            self._entries.setdefault(doc_hash, entry)
+            if url:
+                self._urls.add(url)
+            return is_new
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+def _read_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _append_jsonl(path, record):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
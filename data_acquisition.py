@@ -1,20 +1,31 @@
-import requests
 from bs4 import BeautifulSoup
-import wikiquote
-import wikipedia
 import internetarchive as ia
-from SPARQLWrapper import SPARQLWrapper, JSON
-import praw
+import html
+import itertools
+import json
 import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote as quote_url, urlparse
+from fetch_orchestrator import host_slot, host_limit, map_concurrently, TokenBucket
+from http_session import cached_get, download_to_file, get_session, DEFAULT_TIMEOUT, USER_AGENT
+from instrumentation import span
+from utils import remove_duplicates
 
 # 📚 PROJECT GUTENBERG - SCRAPER
 GUTENBERG_SEARCH_URL = "https://www.gutenberg.org/ebooks/search/?query={}&submit_search=Go%21"
 GUTENBERG_BASE_URL = "https://www.gutenberg.org"
+GUTENBERG_START_MARKER = re.compile(r"^\s*\*{3}\s*START OF (THE|THIS) PROJECT GUTENBERG", re.IGNORECASE)
+GUTENBERG_END_MARKER = re.compile(r"^\s*(\*{3}\s*END OF (THE|THIS) PROJECT GUTENBERG|End of (the )?Project Gutenberg)", re.IGNORECASE)
+GUTENBERG_MAX_HEADER_LINES = 1000  # Give up looking for a START marker after this many lines
 
 def search_gutenberg_books(query):
     """Searches Gutenberg for books based on a query (author or title)."""
     search_url = GUTENBERG_SEARCH_URL.format(query.replace(" ", "+"))
-    response = requests.get(search_url)
+    response = cached_get(search_url)
     if response.status_code != 200:
         print(f"🚨 Failed to search Gutenberg for '{query}'")
         return []
@@ -30,112 +41,428 @@ def search_gutenberg_books(query):
     
     return books
 
-def get_gutenberg_texts(author_keywords, title_keywords):
-    """Fetches texts from Project Gutenberg by searching for author and title keywords."""
-    texts = []
-    
-    # Search by author
-    for author in author_keywords:
-        print(f"🔎 Searching Gutenberg for books by {author}...")
-        books = search_gutenberg_books(author)
-        texts.extend(download_gutenberg_books(books))
-    
-    # Search by title
-    for title in title_keywords:
-        print(f"🔎 Searching Gutenberg for books titled '{title}'...")
-        books = search_gutenberg_books(title)
-        texts.extend(download_gutenberg_books(books))
+def strip_gutenberg_boilerplate(lines):
+    """Yields only the body lines of a Gutenberg text, dropping the header and license.
+
+    Works on a line iterator, so it never holds more than the header in memory. If no
+    START marker turns up within GUTENBERG_MAX_HEADER_LINES, the buffered lines are kept.
+    """
+    lines = iter(lines)
+    header = []
+    for line in lines:
+        if GUTENBERG_START_MARKER.match(line):
+            header = None
+            break
+        header.append(line)
+        if len(header) >= GUTENBERG_MAX_HEADER_LINES:
+            break
+    if header:
+        yield from header
+
+    for line in lines:
+        if GUTENBERG_END_MARKER.match(line):
+            return
+        yield line
+
+def get_gutenberg_texts(author_keywords, title_keywords, output_dir=None, store=None):
+    """Fetches texts from Project Gutenberg by searching for author and title keywords.
+
+    With output_dir set, books are streamed to disk and their file paths are returned
+    instead of their texts. With a CorpusStore, books it already holds are skipped and
+    new ones are added to it.
+    """
+    def search(keyword):
+        query, label = keyword
+        print(f"🔎 Searching Gutenberg for books {label}...")
+        return search_gutenberg_books(query)
+
+    # Search by author and by title
+    keywords = [(author, f"by {author}") for author in author_keywords]
+    keywords += [(title, f"titled '{title}'") for title in title_keywords]
+    results = map_concurrently(search, keywords, host_limit(GUTENBERG_BASE_URL))
+
+    books = remove_duplicates([book for result in results for book in result])
+    if store:
+        books = [book for book in books if not store.has_url(gutenberg_book_url(book[0]))]
+    if output_dir:
+        return stream_gutenberg_books(books, output_dir, store)
+    return download_gutenberg_books(books, store)
+
+def gutenberg_book_url(book_id):
+    return f"{GUTENBERG_BASE_URL}/cache/epub/{book_id}/pg{book_id}.txt"
+
+def stream_gutenberg_books(books, output_dir, store=None):
+    """Streams books from Gutenberg into output_dir/pg{book_id}.txt, minus the boilerplate.
+
+    Returns the paths of the files written (or already up to date). With a CorpusStore,
+    each file is moved into the store and its path there is returned instead.
+    """
+    def download(book):
+        book_id, title = book
+        book_url = gutenberg_book_url(book_id)
+        book_path = os.path.join(output_dir, f"pg{book_id}.txt")
+        print(f"📥 Streaming '{title}' from {book_url}...")
+
+        try:
+            status = download_to_file(book_url, book_path, line_filter=strip_gutenberg_boilerplate)
+            if status in (200, 304) and store:
+                doc_hash, _ = store.add_file("gutenberg", book_path, title=title, url=book_url)
+                return store.path(doc_hash)
+            if status in (200, 304):
+                return book_path
+            print(f"🚨 Failed to download '{title}' (HTTP {status})")
+        except Exception as e:
+            print(f"🚨 Error downloading '{title}': {e}")
+        return None
 
-    return texts
+    paths = map_concurrently(download, books, host_limit(GUTENBERG_BASE_URL))
+    return [path for path in paths if path is not None]
 
-def download_gutenberg_books(books):
+def download_gutenberg_books(books, store=None):
     """Downloads books from Gutenberg given a list of (book_id, title)."""
-    downloaded_texts = []
-    
-    for book_id, title in books:
-        book_url = f"{GUTENBERG_BASE_URL}/cache/epub/{book_id}/pg{book_id}.txt"
+    def download(book):
+        book_id, title = book
+        book_url = gutenberg_book_url(book_id)
         print(f"📥 Downloading '{title}' from {book_url}...")
-        
+
         try:
-            response = requests.get(book_url)
+            response = cached_get(book_url)
             if response.status_code == 200:
-                text = response.text
-                downloaded_texts.append(text)
-            else:
-                print(f"🚨 Failed to download '{title}' (HTTP {response.status_code})")
+                if store:
+                    store.add_text("gutenberg", response.text, title=title, url=book_url)
+                return response.text
+            print(f"🚨 Failed to download '{title}' (HTTP {response.status_code})")
         except Exception as e:
             print(f"🚨 Error downloading '{title}': {e}")
+        return None
+
+    downloaded_texts = map_concurrently(download, books, host_limit(GUTENBERG_BASE_URL))
+    return [text for text in downloaded_texts if text is not None]
+
+# 📖 MEDIAWIKI BULK FETCHER (Wikipedia and Wikiquote)
+MEDIAWIKI_BATCH_SIZE = 50  # Titles per API request (the API's limit for non-bot clients)
+REVISION_CACHE_PATH = os.path.join("cache", "revisions.sqlite")
+WIKI_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+WIKI_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+WIKI_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+WIKI_TABLE = re.compile(r"\{\|(?:(?!\{\|).)*?\|\}", re.DOTALL)
+WIKI_LINK = re.compile(r"\[\[([^\[\]|]*)(?:\|([^\[\]]*))?\]\]")
+WIKI_EXTERNAL_LINK = re.compile(r"\[(?:https?:)?//[^\s\]]+\s*([^\]]*)\]")
+WIKI_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+WIKI_EMPHASIS = re.compile(r"'{2,}")
+WIKI_BLANK_LINES = re.compile(r"\n{3,}")
+WIKI_DROPPED_NAMESPACES = ("file:", "image:", "category:", "media:")
+
+def clean_wikitext(wikitext):
+    """Turns wikitext into plain text: templates, tables, refs, files and markup are dropped, links become their labels."""
+    text = WIKI_REF.sub("", WIKI_COMMENT.sub("", wikitext))
+    # Nested templates, tables and links are peeled from the inside out
+    for pattern in (WIKI_TEMPLATE, WIKI_TABLE):
+        previous = None
+        while previous != text:
+            previous, text = text, pattern.sub("", text)
+
+    def link_label(match):
+        target, label = match.group(1), match.group(2)
+        if target.strip().lower().startswith(WIKI_DROPPED_NAMESPACES):
+            return ""
+        return label if label is not None else target
+
+    previous = None
+    while previous != text:
+        previous, text = text, WIKI_LINK.sub(link_label, text)
+    text = WIKI_EXTERNAL_LINK.sub(r"\1", text)
+    text = WIKI_EMPHASIS.sub("", WIKI_TAG.sub("", text))
+    return WIKI_BLANK_LINES.sub("\n\n", html.unescape(text)).strip()
+
+class RevisionCache:
+    """SQLite cache of page wikitext keyed by API endpoint and title, tagged with its revision ID."""
+
+    def __init__(self, path=REVISION_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                api_url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                revid INTEGER NOT NULL,
+                wikitext TEXT NOT NULL,
+                PRIMARY KEY (api_url, title)
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+    def get_many(self, api_url, titles):
+        """Returns {title: (revid, wikitext)} for the titles that are cached."""
+        titles = list(titles)
+        if not titles:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT title, revid, wikitext FROM pages WHERE api_url=? AND title IN ({','.join('?' * len(titles))})",
+                [api_url, *titles],
+            ).fetchall()
+        return {title: (revid, wikitext) for title, revid, wikitext in rows}
+
+    def put_many(self, api_url, pages):
+        """Stores (title, revid, wikitext) entries."""
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                                 [(api_url, title, revid, wikitext) for title, revid, wikitext in pages])
+
+    def close(self):
+        self._db.close()
+
+class MediaWikiClient:
+    """Fetches many pages per MediaWiki API request, downloading only pages that changed.
 
-    return downloaded_texts
+    Titles go batch_size at a time ("A|B|C"). A first, light prop=info request per
+    batch resolves normalization and redirects, flags missing and disambiguation
+    pages and reports each page's latest revision ID. Pages whose revision is already
+    in the RevisionCache are served from it; only the rest are downloaded, again
+    batch_size per request. Batches run in parallel within the host's limit.
+    """
+
+    def __init__(self, api_url, cache=None, batch_size=MEDIAWIKI_BATCH_SIZE):
+        self.api_url = api_url
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.wiki_url = f"{urlparse(api_url).scheme}://{urlparse(api_url).netloc}/wiki/"
+
+    def page_url(self, title):
+        return self.wiki_url + quote_url(title.replace(" ", "_"))
+
+    def _query(self, **params):
+        """Runs an action=query request, following continuations; returns its pages and title mappings."""
+        params = {"action": "query", "format": "json", "formatversion": 2, **params}
+        pages, mappings, cont = {}, {}, {}
+        while True:
+            with span("mediawiki.query", url=self.api_url, prop=params.get("prop")) as request, host_slot(self.api_url):
+                response = get_session().get(self.api_url, params={**params, **cont}, timeout=DEFAULT_TIMEOUT)
+                request.add(bytes=len(response.content))
+            response.raise_for_status()
+            data = response.json()
+            if "error" in data:
+                raise RuntimeError(data["error"].get("info", data["error"]))
+            query = data.get("query", {})
+            for mapping in query.get("normalized", []) + query.get("redirects", []):
+                mappings[mapping["from"]] = mapping["to"]
+            for page in query.get("pages", []):
+                pages.setdefault(page["title"], {}).update(page)
+            if "continue" not in data:
+                return pages, mappings
+            cont = data["continue"]
+
+    def fetch_batch(self, titles):
+        """Returns [(requested title, page)] for a batch of titles.
+
+        page is {"status": "ok", "title", "url", "revid", "wikitext"}, or just
+        {"status": "missing"} or {"status": "disambiguation", "title"}.
+        """
+        info, mappings = self._query(titles="|".join(titles), redirects=1, prop="info|pageprops",
+                                     ppprop="disambiguation")
+        resolved = {}
+        for title in titles:
+            target, hops = title, 0
+            while target in mappings and hops < 5:
+                target, hops = mappings[target], hops + 1
+            resolved[title] = target
+
+        current = {title: page for title, page in info.items() if not page.get("missing") and not page.get("invalid")
+                   and "disambiguation" not in page.get("pageprops", {})}
+        cached = self.cache.get_many(self.api_url, current) if self.cache else {}
+        wikitexts = {title: cached[title][1] for title, page in current.items()
+                     if title in cached and cached[title][0] == page["lastrevid"]}
+
+        changed = [page["pageid"] for title, page in current.items() if title not in wikitexts]
+        if changed:
+            revisions, _ = self._query(pageids="|".join(map(str, changed)), prop="revisions",
+                                       rvprop="ids|content", rvslots="main")
+            downloaded = []
+            for title, page in revisions.items():
+                if page.get("revisions"):
+                    revision = page["revisions"][0]
+                    wikitexts[title] = revision["slots"]["main"]["content"]
+                    downloaded.append((title, revision["revid"], wikitexts[title]))
+            if self.cache:
+                self.cache.put_many(self.api_url, downloaded)
+
+        results = []
+        for requested, title in resolved.items():
+            if title in wikitexts:
+                results.append((requested, {"status": "ok", "title": title, "url": self.page_url(title),
+                                            "revid": current[title]["lastrevid"], "wikitext": wikitexts[title]}))
+            elif title in info and "disambiguation" in info[title].get("pageprops", {}):
+                results.append((requested, {"status": "disambiguation", "title": title}))
+            else:
+                results.append((requested, {"status": "missing"}))
+        return results
+
+    def iter_pages(self, titles):
+        """Yields (requested title, page) as each batch arrives, so callers can process pages while others download.
+
+        A batch that fails is reported and its titles are skipped.
+        """
+        titles = remove_duplicates(title.strip() for title in titles if title.strip())
+        batches = [titles[start:start + self.batch_size] for start in range(0, len(titles), self.batch_size)]
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=min(host_limit(self.api_url), len(batches))) as pool:
+            futures = {pool.submit(self.fetch_batch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    print(f"🚨 Error fetching {len(futures[future])} pages from {self.api_url}: {e}")
+
+def _mediawiki_client(api_url):
+    return MediaWikiClient(api_url, RevisionCache())
 
 # 🗣️ WIKIQUOTE SCRAPER
-def get_wikiquote_quotes(page_titles, phrases):
-    """Fetches quotes from Wikiquote pages matching given topics."""
-    all_quotes = []
+WIKIQUOTE_API_URL = "https://en.wikiquote.org/w/api.php"
+WIKIQUOTE_HEADING = re.compile(r"^(=+)\s*(.*?)\s*\1\s*$")
+WIKIQUOTE_SKIPPED_SECTIONS = ("see also", "external links", "references", "sources", "notes",
+                              "about", "quotes about", "misattributed", "disputed")
 
-    for title in page_titles:
-        try:
-            quotes = wikiquote.quotes(title, lang="en")
-            for quote in quotes:
-                if not phrases or any(phrase.lower() in quote.lower() for phrase in phrases):
-                    all_quotes.append(quote)
-        except Exception as e:
-            print(f"🚨 Error fetching quotes from Wikiquote page '{title}': {e}")
+def extract_quotes(wikitext):
+    """Yields the quotes on a Wikiquote page: its top-level bullet points, outside the reference-type sections."""
+    skipping = False
+    for line in wikitext.splitlines():
+        heading = WIKIQUOTE_HEADING.match(line)
+        if heading:
+            if len(heading.group(1)) == 2:
+                name = heading.group(2).lower()
+                skipping = name.startswith(WIKIQUOTE_SKIPPED_SECTIONS)
+            continue
+        if not skipping and line.startswith("*") and not line.startswith("**"):
+            quote = clean_wikitext(line[1:]).strip()
+            if quote:
+                yield quote
 
+def get_wikiquote_quotes(page_titles, phrases, store=None, api_url=None):
+    """Fetches quotes from Wikiquote pages matching given topics.
+
+    Pages are fetched in bulk and filtered for the phrases as each one arrives, so the
+    result is in arrival order rather than the order of page_titles.
+    """
+    client = _mediawiki_client(api_url or WIKIQUOTE_API_URL)
+    phrases = [phrase.lower() for phrase in phrases]
+    all_quotes = []
+    try:
+        for title, page in client.iter_pages(page_titles):
+            if page["status"] != "ok":
+                print(f"🚨 Error fetching quotes from Wikiquote page '{title}': {page['status']} page")
+                continue
+            for quote in extract_quotes(page["wikitext"]):
+                if phrases and not any(phrase in quote.lower() for phrase in phrases):
+                    continue
+                all_quotes.append(quote)
+                if store:
+                    store.add_text("wikiquote", quote, title=title, url=page["url"])
+    finally:
+        client.cache.close()
     return all_quotes
 
 # 🌎 WIKIPEDIA SCRAPER
-def fetch_wikipedia_texts(page_titles):
-    """Fetches texts from Wikipedia based on page titles."""
-    texts = []
-    
-    for title in page_titles:
-        try:
-            page = wikipedia.page(title, auto_suggest=False, redirect=True)
-            texts.append(page.content)
-        except wikipedia.exceptions.PageError:
-            print(f"🚨 Error: Wikipedia page '{title}' not found.")
-        except wikipedia.exceptions.DisambiguationError as e:
-            print(f"🚨 Error: '{title}' is ambiguous. Options: {e.options}")
-        except Exception as e:
-            print(f"🚨 Error fetching Wikipedia page '{title}': {e}")
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 
-    return texts
+def fetch_wikipedia_texts(page_titles, store=None, api_url=None):
+    """Fetches texts from Wikipedia based on page titles."""
+    client = _mediawiki_client(api_url or WIKIPEDIA_API_URL)
+    texts = {}
+    try:
+        for title, page in client.iter_pages(page_titles):
+            if page["status"] == "missing":
+                print(f"🚨 Error: Wikipedia page '{title}' not found.")
+            elif page["status"] == "disambiguation":
+                print(f"🚨 Error: '{title}' is ambiguous ('{page['title']}' is a disambiguation page)")
+            else:
+                texts[title] = clean_wikitext(page["wikitext"])
+                if store:
+                    store.add_text("wikipedia", texts[title], title=page["title"], url=page["url"])
+    finally:
+        client.cache.close()
+    return [texts[title] for title in remove_duplicates(t.strip() for t in page_titles) if title in texts]
 
 # 📜 INTERNET ARCHIVE SCRAPER
-def get_internet_archive_texts(collection, mediatype, keyword_search, year):
-    """Fetches texts from the Internet Archive."""
-    all_texts = []
-    
-    search_query = f'collection:{collection} AND mediatype:{mediatype} AND "{keyword_search}" AND year:{year}'
+ARCHIVE_HOST = "archive.org"
+ARCHIVE_TEXT_FORMATS = ['Text', 'DjVuTXT', 'Plain Text']
 
-    try:
-        search = ia.search_items(search_query)
-        count = 0
+def archive_item_url(identifier):
+    return f"https://{ARCHIVE_HOST}/details/{identifier}"
 
-        for result in search:
-            if count >= 5:
-                break  # Stop when we've hit the limit
+def fetch_internet_archive_item(identifier, output_dir=None, store=None):
+    """Fetches the first text file of an Internet Archive item.
 
-            try:
-                identifier = result.get('identifier', None)
-                if not identifier:
-                    continue
+    The item metadata is requested once and its file listing reused for the download.
+    With output_dir set, the file is streamed to output_dir/<identifier>.txt and the
+    path is returned; otherwise the decoded text is. Returns None if there is no text.
+    With a CorpusStore, the text is also added to it (and streamed files moved into it).
+    """
+    with span("archive.metadata", identifier=identifier), host_slot(ARCHIVE_HOST):
+        item = ia.get_item(identifier)
+    text_file = next((file for file in item.get_files(formats=ARCHIVE_TEXT_FORMATS) if file.name), None)
+    if text_file is None:
+        return None
 
-                item = ia.get_item(identifier)
-                files = list(item.get_files(formats=['Text', 'DjVuTXT', 'Plain Text']))
+    if output_dir:
+        text_path = os.path.join(output_dir, f"{identifier}.txt")
+        status = download_to_file(text_file.url, text_path, encoding="utf-8")  # Same decoding as the in-memory branch
+        if status not in (200, 304):
+            raise RuntimeError(f"HTTP {status} for {text_file.name}")
+        if store:
+            doc_hash, _ = store.add_file("internet_archive", text_path,
+                                         title=item.metadata.get("title"), url=archive_item_url(identifier))
+            return store.path(doc_hash)
+        return text_path
 
-                for file in files:
-                    if 'name' in file:
-                        text_file = file['name']
-                        with ia.get_item(identifier).get_file(text_file).open() as f:
-                            text_content = f.read().decode('utf-8', errors='ignore')
-                        all_texts.append(text_content)
-                        count += 1
-                        break  # Only grab the first available text file
+    response = cached_get(text_file.url)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code} for {text_file.name}")
+    text = response.content.decode('utf-8', errors='ignore')
+    if store:
+        store.add_text("internet_archive", text, title=item.metadata.get("title"), url=archive_item_url(identifier))
+    return text
 
-            except Exception as e:
-                print(f"🚨 Error fetching text from IA item {identifier}: {e}")
+def get_internet_archive_texts(collection, mediatype, keyword_search, year, limit=5, output_dir=None, store=None):
+    """Fetches up to `limit` texts from the Internet Archive.
+
+    Search hits are fetched concurrently, a window at a time, until `limit` items with
+    a text file have been collected. With output_dir set, file paths are returned
+    instead of texts. Items already in the CorpusStore, if given, are skipped.
+    """
+    all_texts = []
+
+    search_terms = [f'collection:{collection}', f'mediatype:{mediatype}']
+    if keyword_search:
+        search_terms.append(f'"{keyword_search}"')
+    if year:
+        search_terms.append(f'year:{year}')
+    search_query = " AND ".join(search_terms)
+
+    def fetch(identifier):
+        try:
+            return fetch_internet_archive_item(identifier, output_dir, store)
+        except Exception as e:
+            print(f"🚨 Error fetching text from IA item {identifier}: {e}")
+            return None
+
+    try:
+        with host_slot(ARCHIVE_HOST):
+            search = ia.search_items(search_query, fields=['identifier'])
+        identifiers = (result['identifier'] for result in search if result.get('identifier')
+                       and not (store and store.has_url(archive_item_url(result['identifier']))))
+
+        while len(all_texts) < limit:
+            # Only ask for as many hits as are still missing, so we never overshoot the limit
+            window = list(itertools.islice(identifiers, limit - len(all_texts)))
+            if not window:
+                break
+            results = map_concurrently(fetch, window, host_limit(ARCHIVE_HOST))
+            all_texts.extend(result for result in results if result is not None)
 
     except Exception as e:
         print(f"🚨 Error searching Internet Archive: {e}")
@@ -143,60 +470,285 @@ def get_internet_archive_texts(collection, mediatype, keyword_search, year):
     return all_texts
 
 # 👥 REDDIT SCRAPER
-def fetch_reddit_texts(subreddit_names, post_limit=10, comment_limit=5):
-    """Fetches texts from Reddit based on subreddit, post limit, and comment limit."""
-    all_texts = []
+REDDIT_API_URL = "https://oauth.reddit.com"  # Needs REDDIT_CLIENT_ID / REDDIT_CLIENT_SECRET
+REDDIT_PUBLIC_URL = "https://www.reddit.com"  # Used without credentials, at a much lower quota
+REDDIT_AUTH_URL = "https://www.reddit.com/api/v1/access_token"
+REDDIT_REQUESTS_PER_MINUTE = 100  # Reddit's OAuth quota; the bucket follows the live headers from there
+REDDIT_MAX_LISTING = 100  # Posts per listing request
+REDDIT_TOKEN_MARGIN = 60  # Seconds before an OAuth token's expiry that it is refreshed
 
-    try:
-        reddit = praw.Reddit(
-            client_id=os.environ.get('REDDIT_CLIENT_ID'),
-            client_secret=os.environ.get('REDDIT_CLIENT_SECRET'),
-            user_agent=os.environ.get('REDDIT_USER_AGENT')
-        )
-        for subreddit_name in subreddit_names:
-            subreddit = reddit.subreddit(subreddit_name)
-            for submission in subreddit.hot(limit=post_limit):
-                post_text = submission.selftext
-                comments_text = []
-                submission.comments.replace_more(limit=0)
-                for comment in submission.comments.list()[:comment_limit]:
-                    comments_text.append(comment.body)
-                all_texts.append(post_text + "\n".join(comments_text))
+class RedditClient:
+    """A small client for Reddit's JSON API on the shared pooled session.
 
-    except Exception as e:
-        print(f"🚨 Error fetching from subreddit {subreddit_name}: {e}")
+    Every request waits on a TokenBucket that tracks the X-Ratelimit-* headers, so any
+    number of threads can share one client without running over the quota. With
+    client credentials it authenticates via OAuth; without, it reads the public
+    listings. base_url can point anywhere that serves the same JSON (e.g. a local
+    stand-in server).
+    """
 
-    return all_texts
+    def __init__(self, base_url=None, client_id=None, client_secret=None, user_agent=None,
+                 requests_per_minute=REDDIT_REQUESTS_PER_MINUTE, auth_url=REDDIT_AUTH_URL):
+        self.client_id = client_id if client_id is not None else os.environ.get('REDDIT_CLIENT_ID')
+        self.client_secret = client_secret if client_secret is not None else os.environ.get('REDDIT_CLIENT_SECRET')
+        self.user_agent = user_agent or os.environ.get('REDDIT_USER_AGENT') or USER_AGENT
+        self.base_url = (base_url or (REDDIT_API_URL if self.client_id else REDDIT_PUBLIC_URL)).rstrip("/")
+        self.auth_url = auth_url
+        self.bucket = TokenBucket(requests_per_minute / 60)
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+    def _authorization(self, stale_token=None):
+        """Returns the Authorization header, fetching a token when there is none, it is about to
+        expire, or it is `stale_token` (one the API just rejected)."""
+        if not self.client_id:
+            return {}
+        with self._token_lock:
+            expiring = time.monotonic() >= self._token_expires - REDDIT_TOKEN_MARGIN
+            if self._token is None or expiring or self._token == stale_token:
+                self.bucket.acquire()
+                response = get_session().post(
+                    self.auth_url, data={"grant_type": "client_credentials"},
+                    auth=(self.client_id, self.client_secret or ""),
+                    headers={"User-Agent": self.user_agent}, timeout=DEFAULT_TIMEOUT,
+                )
+                response.raise_for_status()
+                token = response.json()
+                self._token = token["access_token"]
+                self._token_expires = time.monotonic() + float(token.get("expires_in", 3600))
+            return {"Authorization": f"bearer {self._token}"}
+
+    def get(self, path, **params):
+        """GETs a JSON endpoint (e.g. "/r/python/hot.json"), pacing it against the rate limit.
+
+        A 401 (e.g. a token revoked early) is retried once with a fresh token.
+        """
+        url = f"{self.base_url}{path}"
+        authorization = self._authorization()
+        for attempt in range(2):
+            self.bucket.acquire()
+            with span("reddit.get", url=url) as request, host_slot(url):
+                response = get_session().get(
+                    url, params={"raw_json": 1, **params}, timeout=DEFAULT_TIMEOUT,
+                    headers={"User-Agent": self.user_agent, **authorization},
+                )
+                request.add(bytes=len(response.content))
+            if response.status_code != 401 or not authorization or attempt:
+                break
+            authorization = self._authorization(stale_token=authorization["Authorization"].split(" ", 1)[1])
+        if "X-Ratelimit-Remaining" in response.headers:
+            self.bucket.observe(float(response.headers["X-Ratelimit-Remaining"]),
+                                float(response.headers.get("X-Ratelimit-Reset", 60)))
+        response.raise_for_status()
+        return response.json()
+
+    def hot_posts(self, subreddit_name, limit):
+        """Returns up to `limit` hot posts (their "data" dicts), REDDIT_MAX_LISTING per request."""
+        posts, after = [], None
+        while len(posts) < limit:
+            listing = self.get(f"/r/{subreddit_name}/hot.json", limit=min(REDDIT_MAX_LISTING, limit - len(posts)),
+                               **({"after": after} if after else {}))["data"]
+            posts.extend(child["data"] for child in listing["children"] if child["kind"] == "t3")
+            after = listing.get("after")
+            if not after or not listing["children"]:
+                break
+        return posts[:limit]
+
+    def top_comments(self, post_id, limit):
+        """Returns the bodies of up to `limit` top-level comments, asking the API for no more than that."""
+        if limit <= 0:
+            return []
+        _, comments = self.get(f"/comments/{post_id}.json", limit=limit, depth=1)
+        return [child["data"]["body"] for child in comments["data"]["children"] if child["kind"] == "t1"][:limit]
+
+def fetch_reddit_texts(subreddit_names, post_limit=10, comment_limit=5, store=None, base_url=None,
+                       requests_per_minute=REDDIT_REQUESTS_PER_MINUTE):
+    """Fetches texts from Reddit based on subreddit, post limit, and comment limit.
+
+    Subreddits are fetched concurrently through one rate-limited client; a failing
+    subreddit (or post) is reported and skipped without affecting the others.
+    """
+    client = RedditClient(base_url, requests_per_minute=requests_per_minute)
+
+    def fetch(subreddit_name):
+        texts = []
+        try:
+            posts = client.hot_posts(subreddit_name, post_limit)
+        except Exception as e:
+            print(f"🚨 Error fetching from subreddit {subreddit_name}: {e}")
+            return texts
+
+        def fetch_comments(post):
+            try:
+                return client.top_comments(post["id"], comment_limit)
+            except Exception as e:
+                print(f"🚨 Error fetching comments for post {post['id']} in {subreddit_name}: {e}")
+                return []
+
+        for post, comments_text in zip(posts, map_concurrently(fetch_comments, posts, host_limit(client.base_url))):
+            texts.append(post.get("selftext", "") + "\n".join(comments_text))
+            if store:
+                store.add_text("reddit", texts[-1], title=post.get("title"),
+                               url=f"https://www.reddit.com{post.get('permalink', '')}")
+        return texts
+
+    results = map_concurrently(fetch, subreddit_names, host_limit(client.base_url))
+    return [text for texts in results for text in texts]
 
 # 🔍 WIKIDATA SCRAPER
-def get_wikidata_items(queries):
-    """Fetches Wikidata items and their descriptions."""
-    all_items = []
+WIKIDATA_SPARQL_URL = "https://query.wikidata.org/sparql"
+WIKIDATA_BATCH_SIZE = 50  # Labels per SPARQL query; larger VALUES blocks risk the 60s query timeout
+WIKIDATA_MAX_ITEMS_PER_LABEL = 100
+WIKIDATA_CACHE_PATH = os.path.join("cache", "wikidata.sqlite")
+WIKIDATA_CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached label is looked up again
+
+class WikidataCache:
+    """SQLite cache of Wikidata lookups, one row per label, expiring after ttl seconds.
+
+    Labels that matched nothing are cached too, so they are not asked about again
+    until they expire.
+    """
+
+    def __init__(self, path=WIKIDATA_CACHE_PATH, ttl=WIKIDATA_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS labels (
+                label TEXT PRIMARY KEY,
+                items TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+    def get_many(self, labels):
+        """Returns {label: items} for the labels with an unexpired entry."""
+        found = {}
+        labels = list(labels)
+        with self._lock:
+            for start in range(0, len(labels), WIKIDATA_BATCH_SIZE):
+                batch = labels[start:start + WIKIDATA_BATCH_SIZE]
+                rows = self._db.execute(
+                    f"SELECT label, items FROM labels WHERE fetched_at >= ? AND label IN ({','.join('?' * len(batch))})",
+                    [time.time() - self.ttl, *batch],
+                )
+                found.update((label, json.loads(items)) for label, items in rows)
+        return found
+
+    def put_many(self, results):
+        """Stores a {label: items} dict."""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?)", [
+                (label, json.dumps(items, ensure_ascii=False), now) for label, items in results.items()
+            ])
+
+    def close(self):
+        self._db.close()
+
+def _sparql_string(text):
+    """Quotes text as a SPARQL string literal."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r") + '"'
+
+class WikidataClient:
+    """Looks up many labels per SPARQL request, with a per-label cache in front.
 
-    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
+    Labels go to the endpoint batch_size at a time in a single request (a UNION of
+    per-label subqueries, each capped at WIKIDATA_MAX_ITEMS_PER_LABEL), and the
+    batches run concurrently (within the endpoint's host limit), so thousands of
+    terms take a handful of requests, and only the ones not already cached.
+    """
 
-    for query in queries:
-        query_string = f"""
-        SELECT DISTINCT ?item ?itemLabel ?description
+    def __init__(self, endpoint=None, cache=None, batch_size=WIKIDATA_BATCH_SIZE):
+        self.endpoint = endpoint or WIKIDATA_SPARQL_URL
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+
+    def build_query(self, labels):
+        """One LIMITed subquery per label, so a label with hundreds of items can't crowd the others out."""
+        subqueries = "\n          UNION\n".join(f"""          {{
+            SELECT DISTINCT ?label ?item ?itemLabel ?description
+            WHERE {{
+              VALUES ?label {{ {_sparql_string(label)}@en }}
+              ?item rdfs:label|skos:altLabel ?label .
+              ?item schema:description ?description.
+              FILTER(LANG(?description) = "en")
+              OPTIONAL {{ ?item rdfs:label ?itemLabel. FILTER(LANG(?itemLabel) = "en") }}
+            }}
+            LIMIT {WIKIDATA_MAX_ITEMS_PER_LABEL}
+          }}""" for label in labels)
+        return f"""
+        SELECT ?label ?item ?itemLabel ?description
         WHERE {{
-          ?item rdfs:label|skos:altLabel "{query}"@en .
-          ?item schema:description ?description.
-          FILTER(LANG(?description) = "en")
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }}
+{subqueries}
         }}
-        LIMIT 100
         """
-        sparql.setQuery(query_string)
-        sparql.setReturnFormat(JSON)
-        try:
-            results = sparql.query().convert()
-            for result in results["results"]["bindings"]:
-                item_data = {
-                    "label": result["itemLabel"]["value"],
-                    "description": result["description"]["value"],
-                }
-                all_items.append(item_data)
-        except Exception as e:
-            print(f"🚨 Error querying Wikidata: {e}")
 
-    return all_items
+    def query_batch(self, labels):
+        """Runs one SPARQL request for a batch of labels; returns {label: [item dicts]}."""
+        with span("wikidata.query", url=self.endpoint) as request, host_slot(self.endpoint):
+            response = get_session().post(
+                self.endpoint, data={"query": self.build_query(labels)},
+                headers={"Accept": "application/sparql-results+json"}, timeout=DEFAULT_TIMEOUT,
+            )
+            request.add(bytes=len(response.content), docs=len(labels))
+        response.raise_for_status()
+        results = {label: [] for label in labels}
+        for result in response.json()["results"]["bindings"]:
+            items = results.get(result["label"]["value"])
+            if items is None or len(items) >= WIKIDATA_MAX_ITEMS_PER_LABEL:
+                continue
+            items.append({
+                "label": result.get("itemLabel", result["label"])["value"],
+                "description": result["description"]["value"],
+                "url": result["item"]["value"],
+            })
+        return results
+
+    def lookup(self, labels):
+        """Returns {label: [item dicts]} for every label, serving what it can from the cache.
+
+        A batch that fails is reported and its labels are left out (and not cached).
+        """
+        labels = remove_duplicates(label for label in labels if label)
+        results = self.cache.get_many(labels) if self.cache else {}
+        missing = [label for label in labels if label not in results]
+        batches = [missing[start:start + self.batch_size] for start in range(0, len(missing), self.batch_size)]
+
+        def fetch(batch):
+            try:
+                fetched = self.query_batch(batch)
+            except Exception as e:
+                print(f"🚨 Error querying Wikidata for {len(batch)} labels: {e}")
+                return {}
+            if self.cache:
+                self.cache.put_many(fetched)
+            return fetched
+
+        for fetched in map_concurrently(fetch, batches, host_limit(self.endpoint)):
+            results.update(fetched)
+        return {label: results[label] for label in labels if label in results}
+
+def get_wikidata_items(queries, store=None, endpoint=None, batch_size=WIKIDATA_BATCH_SIZE,
+                       cache_path=WIKIDATA_CACHE_PATH, cache_ttl=WIKIDATA_CACHE_TTL):
+    """Fetches Wikidata items and their descriptions."""
+    cache = WikidataCache(cache_path, cache_ttl) if cache_path else None
+    try:
+        results = WikidataClient(endpoint, cache, batch_size).lookup(queries)
+    finally:
+        if cache:
+            cache.close()
+
+    items = []
+    for matches in results.values():
+        for match in matches:
+            items.append({"label": match["label"], "description": match["description"]})
+            if store:
+                store.add_text("wikidata", f"{match['label']}: {match['description']}",
+                               title=match["label"], url=match["url"])
+    return items
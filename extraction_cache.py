@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 🧠 PER-DOCUMENT EXTRACTION CACHE
+DEFAULT_CACHE_PATH = os.path.join("cache", "extractions.sqlite")
+DEFAULT_MAX_ENTRIES = 50000
+
+def document_hash(text):
+    """SHA-256 of a document's text (the same key the corpus store uses)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ExtractionCache:
+    """SQLite-backed cache of aggregated keyword rows, one entry per parsed document.
+
+    Entries are keyed by document hash, spaCy model name and version, category and the
+    set of requested outputs, so upgrading the model or changing what is extracted never
+    serves stale results. Once there are more than max_entries, the least recently used
+    entries are dropped.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                doc_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                category TEXT NOT NULL,
+                outputs TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (doc_hash, model, model_version, category, outputs)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        """Returns the cached rows for a key tuple, or None on a miss."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rows FROM extractions WHERE doc_hash=? AND model=? AND model_version=? AND category=? AND outputs=?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE extractions SET last_used=? WHERE doc_hash=? AND model=? AND model_version=? AND category=? AND outputs=?",
+                (time.time(), *key),
+            )
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key, rows):
+        """Stores the rows for a key tuple, evicting the least recently used entries if over the cap."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(rows, ensure_ascii=False), time.time()),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM extractions").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM extractions WHERE rowid IN (SELECT rowid FROM extractions ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from instrumentation import span
+
+# ⚙️ PER-HOST CONCURRENCY LIMITS
+DEFAULT_HOST_LIMIT = 4
+
+_host_limits = {}
+_default_host_limit = DEFAULT_HOST_LIMIT
+_host_semaphores = {}
+_lock = threading.Lock()
+
+def _host_of(url_or_host):
+    """Returns the host part of a URL, or the argument itself if it is already a host."""
+    return urlparse(url_or_host).netloc or url_or_host
+
+def configure_host_limits(per_host=None, default=DEFAULT_HOST_LIMIT):
+    """Sets how many requests may be in flight at once for each host."""
+    global _default_host_limit
+    with _lock:
+        _host_limits.clear()
+        _host_limits.update({host: max(1, int(limit)) for host, limit in (per_host or {}).items()})
+        _default_host_limit = max(1, int(default))
+        _host_semaphores.clear()
+
+def host_limit(url_or_host):
+    """Returns the configured concurrency cap for a host."""
+    return _host_limits.get(_host_of(url_or_host), _default_host_limit)
+
+def _semaphore_for(host):
+    with _lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(_host_limits.get(host, _default_host_limit))
+        return _host_semaphores[host]
+
+@contextmanager
+def host_slot(url_or_host):
+    """Blocks until a request slot for the host is free, and holds it for the duration of the block."""
+    semaphore = _semaphore_for(_host_of(url_or_host))
+    with semaphore:
+        yield
+
+# 🪣 RATE LIMITING
+class TokenBucket:
+    """Spaces requests out to at most `rate` per second, with bursts of up to `capacity`.
+
+    APIs that report their remaining quota (e.g. Reddit's X-Ratelimit-Remaining and
+    X-Ratelimit-Reset headers) can feed it back through observe(), which slows the
+    bucket down to spread what is left over the rest of the window, and stops it
+    entirely until the reset once the quota is used up. Safe to share across threads.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def observe(self, remaining, reset_seconds):
+        """Adjusts to the server's view: `remaining` requests allowed in the next `reset_seconds`."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining < 1:
+                self._tokens = 0
+                self._blocked_until = now + reset_seconds
+            else:
+                self._tokens = min(self._tokens, remaining)
+                self.rate = min(self.max_rate, remaining / max(reset_seconds, 1))
+
+# 🧵 FAN-OUT HELPERS
+def map_concurrently(func, items, max_workers=DEFAULT_HOST_LIMIT):
+    """Applies func to every item on a thread pool and returns the results in input order."""
+    items = list(items)
+    if not items:
+        return []
+    if max_workers <= 1 or len(items) == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+def run_sources(jobs, max_workers=None):
+    """Runs each named zero-argument fetch job in parallel.
+
+    Returns a (results, timings) pair of dicts keyed by job name. A job that raises
+    is reported and yields an empty list, so one broken source never sinks the others.
+    """
+    def timed(item):
+        name, job = item
+        start = time.perf_counter()
+        try:
+            with span(f"source.{name}") as source:
+                result = job()
+                source.add(docs=len(result))
+        except Exception as e:
+            print(f"🚨 Source '{name}' failed: {e}")
+            result = []
+        return name, result, time.perf_counter() - start
+
+    outcomes = map_concurrently(timed, jobs.items(), max_workers or len(jobs))
+    results = {name: result for name, result, _ in outcomes}
+    timings = {name: seconds for name, _, seconds in outcomes}
+    return results, timings
@@ -0,0 +1,247 @@
+import codecs
+import hashlib
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from fetch_orchestrator import host_slot
+from instrumentation import span
+
+# 🌐 SHARED, POOLED HTTP SESSION
+USER_AGENT = "gay_lexicon/1.0 (research corpus builder)"
+DEFAULT_TIMEOUT = 30
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Returns the process-wide requests session, so connections are reused across scrapers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=("GET", "HEAD"))
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+# 💾 ON-DISK RESPONSE CACHE
+DEFAULT_CACHE_DIR = os.path.join("cache", "http")
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+class CachedResponse:
+    """A stored response body that quacks like the parts of requests.Response we use."""
+
+    def __init__(self, url, status_code, content, headers, encoding, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+class ResponseCache:
+    """Stores response bodies keyed by URL, with their ETag/Last-Modified validators.
+
+    Entries live as <sha256(url)>.body / .json pairs. Every hit touches the metadata
+    file, and once the bodies exceed max_bytes the least recently used entries go first.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(os.path.getsize(os.path.join(cache_dir, name))
+                                for name in os.listdir(cache_dir) if name.endswith(".body"))
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def lookup(self, url):
+        """Returns the stored metadata for a URL, or None if it is not cached."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return meta if os.path.exists(body_path) else None
+
+    def load(self, url, meta):
+        """Builds a response from a cached entry."""
+        body_path, _ = self._paths(url)
+        with open(body_path, "rb") as f:
+            content = f.read()
+        return CachedResponse(url, 200, content, meta.get("headers", {}), meta.get("encoding"), from_cache=True)
+
+    def store(self, url, response):
+        """Saves a 200 response along with its validators, then evicts down to the size cap."""
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding or response.apparent_encoding,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "size": len(response.content),
+        }
+        body_path, meta_path = self._paths(url)
+        with self._lock:
+            old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            _atomic_write(body_path, response.content, "wb")
+            _atomic_write(meta_path, json.dumps(meta), "w")
+            self._total_bytes += meta["size"] - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                meta_path = os.path.join(self.cache_dir, name)
+                body_path = meta_path[:-len(".json")] + ".body"
+                size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+                entries.append((os.path.getmtime(meta_path), size, body_path, meta_path))
+
+        for _, size, body_path, meta_path in sorted(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            for path in (body_path, meta_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._total_bytes -= size
+
+def _atomic_write(path, data, mode):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+_cache = None
+
+def configure_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+    """Points the shared response cache at a directory and size budget."""
+    global _cache
+    _cache = ResponseCache(cache_dir, max_bytes)
+    return _cache
+
+def get_cache():
+    """Returns the shared response cache, creating it with defaults on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+def cached_get(url, cache=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GETs a URL through the pooled session, revalidating any cached copy.
+
+    A 304 answer is served from disk, so unchanged pages cost one tiny round trip.
+    Responses without ETag or Last-Modified are not cached, since they could never
+    be revalidated.
+    """
+    cache = cache or get_cache()
+    headers = dict(kwargs.pop("headers", None) or {})
+    meta = cache.lookup(url)
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with span("http.get", url=url) as request:
+        with host_slot(url):
+            response = get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+        request.attrs["status"] = response.status_code
+        request.add(bytes=len(response.content))
+
+    if response.status_code == 304 and meta:
+        return cache.load(url, meta)
+    if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+        cache.store(url, response)
+    return response
+
+# 🌊 STREAMING DOWNLOADS
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def response_encoding(response):
+    """The charset the response declares, else UTF-8.
+
+    requests falls back to ISO-8859-1 for any text/* response without a charset, which
+    turns UTF-8 text into mojibake ("CafÃ©"); nearly all text served today is UTF-8.
+    """
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return "utf-8"
+
+def iter_response_lines(response, chunk_size=STREAM_CHUNK_SIZE, encoding=None):
+    """Yields decoded lines (with line endings) from a streamed response, one chunk at a time.
+
+    Decodes with `encoding` if given, else with response_encoding(response).
+    """
+    decoder = codecs.getincrementaldecoder(encoding or response_encoding(response))(errors="replace")
+    pending = ""
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # The last piece may be unfinished (or a CR whose LF is in the next chunk), so hold it back
+        pending = lines.pop() if lines else ""
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def download_to_file(url, dest_path, line_filter=None, timeout=DEFAULT_TIMEOUT, encoding=None):
+    """Streams a text URL straight into dest_path (as UTF-8) and returns the HTTP status.
+
+    The body is decoded with `encoding` if given, else with the charset the response
+    declares, else as UTF-8.
+
+    line_filter, if given, takes an iterator of lines and yields the lines to keep, so
+    boilerplate can be dropped on the fly. Validators are kept in a <dest>.meta.json
+    sidecar; when the file is already on disk an unchanged source answers 304 and
+    nothing is rewritten.
+    """
+    meta_path = dest_path + ".meta.json"
+    headers = {}
+    if os.path.exists(dest_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with span("http.download", url=url) as download, host_slot(url), \
+            get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        download.attrs["status"] = response.status_code
+        if response.status_code != 200:
+            return response.status_code
+
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp_path = f"{dest_path}.{threading.get_ident()}.tmp"
+        lines = iter_response_lines(response, encoding=encoding)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(line_filter(lines) if line_filter else lines)
+        os.replace(tmp_path, dest_path)
+        download.add(bytes=response.raw.tell())  # As transferred, before decoding and filtering
+
+        meta = {"url": url, "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        _atomic_write(meta_path, json.dumps(meta), "w")
+        return 200
@@ -0,0 +1,197 @@
+import cProfile
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# 📊 RUN INSTRUMENTATION
+REPORTS_FOLDER = os.environ.get("INSTRUMENT_DIR", "reports")
+REPORTS_ENABLED = os.environ.get("INSTRUMENT_REPORTS", "1") != "0"  # A JSON report per run unless set to 0
+PROFILE_ENABLED = os.environ.get("INSTRUMENT_PROFILE") == "1"  # cProfile the main thread
+TRACEMALLOC_ENABLED = os.environ.get("INSTRUMENT_TRACEMALLOC") == "1"  # Track Python allocations
+MAX_EVENTS = 10_000  # Individual spans kept in the report; the per-name totals always cover all of them
+TOP_ENTRIES = 30  # Functions / allocation sites listed from the profile and tracemalloc
+COUNTERS = ("bytes", "docs", "tokens")
+
+def peak_rss_megabytes():
+    """The process's peak resident set size so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+class Span:
+    """One timed piece of work. Add what it processed with add(bytes=..., docs=..., tokens=...)."""
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.error = None
+        self.seconds = None
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+class Recorder:
+    """Collects spans from any thread and totals them per span name.
+
+    The totals for every name are kept exactly; only the first MAX_EVENTS individual
+    spans are kept, so instrumenting every HTTP request of a huge run stays cheap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, run_name=None):
+        with self._lock:
+            self.run_name = run_name
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self.totals = {}
+            self.events = []
+            self.dropped_events = 0
+
+    def record(self, span, start_offset, rss_growth):
+        with self._lock:
+            totals = self.totals.setdefault(span.name, {
+                "count": 0, "errors": 0, "seconds_total": 0.0, "seconds_min": None, "seconds_max": 0.0,
+                **dict.fromkeys(COUNTERS, 0), "rss_growth_megabytes": 0.0,
+            })
+            totals["count"] += 1
+            totals["errors"] += span.error is not None
+            totals["seconds_total"] += span.seconds
+            totals["seconds_min"] = span.seconds if totals["seconds_min"] is None else min(totals["seconds_min"], span.seconds)
+            totals["seconds_max"] = max(totals["seconds_max"], span.seconds)
+            for key, value in span.counters.items():
+                totals[key] = totals.get(key, 0) + value
+            totals["rss_growth_megabytes"] += rss_growth
+
+            if len(self.events) < MAX_EVENTS:
+                self.events.append({
+                    "name": span.name, "start": round(start_offset, 6), "seconds": round(span.seconds, 6),
+                    "thread": threading.current_thread().name, "error": span.error,
+                    **{key: value for key, value in span.counters.items() if value}, **span.attrs,
+                })
+            else:
+                self.dropped_events += 1
+
+    def summary(self):
+        with self._lock:
+            spans = {}
+            for name, totals in sorted(self.totals.items()):
+                spans[name] = {**totals, "seconds_mean": totals["seconds_total"] / totals["count"]}
+                seconds = totals["seconds_total"]
+                if seconds:
+                    spans[name].update({f"{key}_per_second": totals[key] / seconds for key in COUNTERS if totals[key]})
+            return spans, list(self.events), self.dropped_events
+
+_recorder = Recorder()
+_profiler = None
+
+@contextmanager
+def span(name, **attrs):
+    """Times the block as a span called name; yields the Span so the block can add() counts to it.
+
+    attrs (e.g. url=..., source=...) are stored with the individual span in the report.
+    """
+    current = Span(name, attrs)
+    start = time.perf_counter()
+    peak_before = peak_rss_megabytes()
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        _recorder.record(current, start - _recorder._start, peak_rss_megabytes() - peak_before)
+
+def record(name, seconds=0.0, **counters):
+    """Records a span that was timed elsewhere (e.g. one batch inside a generator)."""
+    finished = Span(name, {})
+    finished.add(**counters)
+    finished.seconds = seconds
+    _recorder.record(finished, time.perf_counter() - seconds - _recorder._start, 0.0)
+
+# 📝 Run reports
+def start_run(name):
+    """Starts a fresh report for this invocation, and cProfile/tracemalloc if they are switched on."""
+    global _profiler
+    _recorder.reset(name)
+    if TRACEMALLOC_ENABLED and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if PROFILE_ENABLED:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def _profile_summary(path):
+    _profiler.disable()
+    _profiler.dump_stats(path)
+    stats = pstats.Stats(_profiler)
+    top = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_ENTRIES]:
+        top.append({"function": f"{os.path.basename(filename)}:{line}({function})", "calls": calls,
+                    "own_seconds": own, "cumulative_seconds": cumulative})
+    return {"stats_file": path, "top_cumulative": top}
+
+def _tracemalloc_summary():
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ENTRIES]
+    return {
+        "current_megabytes": current / 1024 / 1024,
+        "peak_megabytes": peak / 1024 / 1024,
+        "top_allocations": [{"site": str(stat.traceback), "megabytes": stat.size / 1024 / 1024, "blocks": stat.count}
+                            for stat in top],
+    }
+
+def finish_run(extra=None):
+    """Writes the run report to REPORTS_FOLDER/<run>_<timestamp>.json and returns its path (None if disabled)."""
+    global _profiler
+    spans, events, dropped = _recorder.summary()
+    if not REPORTS_ENABLED:
+        if _profiler is not None:
+            _profiler.disable()
+            _profiler = None
+        return None
+    os.makedirs(REPORTS_FOLDER, exist_ok=True)
+    stem = os.path.join(REPORTS_FOLDER, f"{_recorder.run_name or 'run'}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+    report = {
+        "run": _recorder.run_name,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_recorder.started_at)),
+        "seconds": time.perf_counter() - _recorder._start,
+        "argv": sys.argv,
+        "pid": os.getpid(),
+        "peak_rss_megabytes": peak_rss_megabytes(),
+        "spans": spans,
+        "events": events,
+        "dropped_events": dropped,
+        **(extra or {}),
+    }
+    if _profiler is not None:
+        report["profile"] = _profile_summary(f"{stem}.prof")
+        _profiler = None
+    if tracemalloc.is_tracing():
+        report["tracemalloc"] = _tracemalloc_summary()
+
+    with open(f"{stem}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    return f"{stem}.json"
+
+@contextmanager
+def instrumented_run(name):
+    """Wraps a whole invocation: starts the report, and writes it even if the run fails."""
+    start_run(name)
+    try:
+        with span(name):
+            yield
+    finally:
+        path = finish_run()
+        if path:
+            print(f"📊 Run report saved to {path}")
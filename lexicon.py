@@ -1,8 +1,20 @@
 import json
+import os
+import sqlite3
+import time
 
 def generate_lexicon(word_frequencies, existing_lexicon={}):
-    """Generates or updates a lexicon based on word frequencies, with user approval."""
-    approved_lexicon = existing_lexicon.copy()  # Start with existing lexicon
+    """Generates or updates a lexicon based on word frequencies, with user approval.
+
+    Pass a LexiconStore as existing_lexicon to have each approval committed as it is
+    made; a plain dict is copied and returned as before. Terms are offered in the
+    order given, so pass candidate_mining.mine_candidates output to review the most
+    promising terms first.
+    """
+    if isinstance(existing_lexicon, LexiconStore):
+        approved_lexicon = existing_lexicon  # Approvals are written straight to the store
+    else:
+        approved_lexicon = existing_lexicon.copy()  # Start with existing lexicon
 
     print("\n--- Reviewing potential lexicon terms ---")
     for term, count in word_frequencies.items():
@@ -41,3 +53,130 @@ def save_lexicon(lexicon, filepath="approved_lexicon.json"):
             json.dump(lexicon, f, indent=4)  # Use json.dump for structured output
     except Exception as e:
         print(f"Error saving lexicon: {e}")
+
+# 🗃️ SQLITE LEXICON STORE
+LEXICON_DB = "approved_lexicon.sqlite"
+LOOKUP_BATCH_SIZE = 500  # Stay well under SQLite's bound-parameter limit
+
+class LexiconStore:
+    """An approved lexicon kept in SQLite instead of one big JSON file.
+
+    Behaves like the dict generate_lexicon works on (`term in store`, `store[term]`,
+    `store.get(term, 0)`, `store[term] = count`), but every write is an upsert
+    committed on the spot, so a crash mid-review loses nothing, and lookups never
+    load the whole lexicon. get_entry / get_many return the full records, tones included.
+    """
+
+    def __init__(self, path=LEXICON_DB):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS lexicon (
+                term TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                tones TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+    def __contains__(self, term):
+        return self._db.execute("SELECT 1 FROM lexicon WHERE term=?", (term,)).fetchone() is not None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM lexicon").fetchone()[0]
+
+    def __getitem__(self, term):
+        row = self._db.execute("SELECT count FROM lexicon WHERE term=?", (term,)).fetchone()
+        if row is None:
+            raise KeyError(term)
+        return row[0]
+
+    def __setitem__(self, term, count):
+        self.upsert(term, count)
+
+    def get(self, term, default=None):
+        """Returns a term's count, or default, like dict.get (and store[term])."""
+        try:
+            return self[term]
+        except KeyError:
+            return default
+
+    def get_entry(self, term, default=None):
+        """Returns the full {"count", "tones"} record for a term, or default."""
+        return self.get_many([term]).get(term, default)
+
+    def get_many(self, terms):
+        """Looks up many terms in batches; returns {term: {"count", "tones"}} for those present."""
+        found = {}
+        terms = list(terms)
+        for start in range(0, len(terms), LOOKUP_BATCH_SIZE):
+            batch = terms[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            for term, count, tones in self._db.execute(
+                    f"SELECT term, count, tones FROM lexicon WHERE term IN ({placeholders})", batch):
+                found[term] = {"count": count, "tones": json.loads(tones)}
+        return found
+
+    def with_prefix(self, prefix, limit=None):
+        """Returns (term, count) pairs for terms starting with prefix, in term order."""
+        sql = "SELECT term, count FROM lexicon WHERE term >= ? AND term < ? ORDER BY term"
+        params = [prefix, prefix + "\U0010ffff"]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._db.execute(sql, params).fetchall()
+
+    def upsert(self, term, count, tones=None):
+        """Inserts or updates one term and commits immediately."""
+        self.upsert_many([(term, count, tones)])
+
+    def upsert_many(self, entries):
+        """Inserts or updates (term, count, tones) entries in one transaction.
+
+        A tones value of None keeps whatever tones the term already has.
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany("""
+                INSERT INTO lexicon (term, count, tones, updated_at) VALUES (?, ?, COALESCE(?, '[]'), ?)
+                ON CONFLICT(term) DO UPDATE SET
+                    count=excluded.count,
+                    tones=COALESCE(?, lexicon.tones),
+                    updated_at=excluded.updated_at
+            """, [(term, count, _tones_json(tones), now, _tones_json(tones)) for term, count, tones in entries])
+
+    def delete(self, term):
+        with self._db:
+            self._db.execute("DELETE FROM lexicon WHERE term=?", (term,))
+
+    def items(self):
+        """Yields (term, count) pairs in term order without loading them all at once."""
+        yield from self._db.execute("SELECT term, count FROM lexicon ORDER BY term")
+
+    def import_json(self, filepath="approved_lexicon.json"):
+        """Upserts every term from a JSON lexicon ({term: count} or {term: {"count", "tones"}})."""
+        lexicon = load_lexicon(filepath)
+        self.upsert_many(
+            (term, value["count"], value.get("tones")) if isinstance(value, dict) else (term, value, None)
+            for term, value in lexicon.items()
+        )
+        return len(lexicon)
+
+    def export_json(self, filepath="approved_lexicon.json"):
+        """Writes the lexicon out as the {term: count} JSON that save_lexicon produces."""
+        save_lexicon(dict(self.items()), filepath)
+
+    def close(self):
+        self._db.close()
+
+def _tones_json(tones):
+    return None if tones is None else json.dumps(list(tones), ensure_ascii=False)
+
+def open_lexicon(path=LEXICON_DB, json_path="approved_lexicon.json"):
+    """Opens the SQLite lexicon, seeding it from the old JSON file the first time."""
+    store = LexiconStore(path)
+    if len(store) == 0 and os.path.exists(json_path):
+        print(f"Importing {store.import_json(json_path)} terms from '{json_path}'.")
+    return store
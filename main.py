@@ -1,6 +1,5 @@
 import json
 import os
-import time
 from data_acquisition import (
     get_gutenberg_texts,
     get_wikiquote_quotes,
@@ -9,10 +8,37 @@ from data_acquisition import (
     fetch_reddit_texts,
     get_wikidata_items,
 )
+from fetch_orchestrator import configure_host_limits, run_sources
+from http_session import configure_cache
+from corpus_store import CorpusStore, CORPUS_FOLDER
+from columnar_export import export_documents, columnar_path, COLUMNAR_FOLDER
+from instrumentation import instrumented_run
 
 # Load or create config file
 CONFIG_FILE = "config.json"
 
+# Per-host caps on simultaneous requests; hosts not listed use "default_per_host"
+DEFAULT_CONCURRENCY = {
+    "default_per_host": 4,
+    "per_host": {
+        "www.gutenberg.org": 2,
+        "en.wikiquote.org": 4,
+        "en.wikipedia.org": 4,
+        "archive.org": 4,
+        "oauth.reddit.com": 2,
+        "query.wikidata.org": 2,
+    },
+}
+
+# Conditional-GET response cache shared by the scrapers
+DEFAULT_HTTP_CACHE = {"directory": os.path.join("cache", "http"), "max_megabytes": 512}
+
+# Content-addressed document store that every run adds to
+DEFAULT_CORPUS = {"directory": CORPUS_FOLDER}
+
+# Parquet ("parquet") or memory-mappable Arrow IPC ("arrow") copy of each run's new documents
+DEFAULT_COLUMNAR_EXPORT = {"enabled": False, "directory": COLUMNAR_FOLDER, "format": "parquet"}
+
 def load_config():
     """Loads the configuration from config.json, or creates one if missing."""
     if not os.path.exists(CONFIG_FILE):
@@ -27,9 +53,14 @@ def load_config():
                 "mediatype": "texts",
                 "keyword_search": "",
                 "year": "",
+                "limit": 5,
             },
             "reddit": {"enabled": True, "subreddit_names": [], "post_limit": 10, "comment_limit": 5},
             "wikidata": {"enabled": True, "queries": []},
+            "concurrency": DEFAULT_CONCURRENCY,
+            "http_cache": DEFAULT_HTTP_CACHE,
+            "corpus": DEFAULT_CORPUS,
+            "columnar_export": DEFAULT_COLUMNAR_EXPORT,
         }
         with open(CONFIG_FILE, "w") as f:
             json.dump(default_config, f, indent=4)
@@ -83,55 +114,83 @@ def main():
 
     # Fetch data
     print("\n✨ Fetching all the juicy texts... Hold on to your wigs! ⏳✨\n")
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
 
-    # Create output folder
+    # Create output folder (streamed downloads land here before moving into the corpus store)
     OUTPUT_FOLDER = "output"
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER)
 
-    # Fetch texts
-    gutenberg_texts = get_gutenberg_texts(
-        config["project_gutenberg"]["author_keywords"],
-        config["project_gutenberg"]["title_keywords"],
-    )
-    
-    wikiquote_texts = get_wikiquote_quotes(config["wikiquote"]["page_titles"], config["wikiquote"]["phrases"])
-    wikipedia_texts = fetch_wikipedia_texts(config["wikipedia"]["page_titles"])
-    archive_texts = get_internet_archive_texts(
-        config["internet_archive"]["collection"],
-        config["internet_archive"]["mediatype"],
-        config["internet_archive"]["keyword_search"],
-        config["internet_archive"]["year"],
-    )
-    reddit_texts = fetch_reddit_texts(config["reddit"]["subreddit_names"], 20, 10)
-    wikidata_entries = get_wikidata_items(config["wikidata"]["queries"])
-
-    # Save results
-    with open(f"{OUTPUT_FOLDER}/gutenberg_texts_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join(gutenberg_texts))
-    with open(f"{OUTPUT_FOLDER}/wikiquote_quotes_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join(wikiquote_texts))
-    with open(f"{OUTPUT_FOLDER}/wikipedia_texts_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join(wikipedia_texts))
-    with open(f"{OUTPUT_FOLDER}/archive_texts_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join(archive_texts))
-    with open(f"{OUTPUT_FOLDER}/reddit_threads_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join(reddit_texts))
-    with open(f"{OUTPUT_FOLDER}/wikidata_entries_{timestamp}.txt", "w", encoding="utf-8") as f:
-        f.write("\n\n".join([f"{entry['label']}: {entry['description']}" for entry in wikidata_entries]))
+    store = CorpusStore(config.get("corpus", DEFAULT_CORPUS)["directory"])
+    previous_runs = store.runs()
+    run_id = store.start_run()
+
+    # Fetch texts from every source at once, each capped per host
+    concurrency = config.get("concurrency", DEFAULT_CONCURRENCY)
+    configure_host_limits(concurrency.get("per_host", {}), concurrency.get("default_per_host", 4))
+    http_cache = config.get("http_cache", DEFAULT_HTTP_CACHE)
+    configure_cache(http_cache["directory"], http_cache["max_megabytes"] * 1024 * 1024)
+
+    results, timings = run_sources({
+        "gutenberg": lambda: get_gutenberg_texts(
+            config["project_gutenberg"]["author_keywords"],
+            config["project_gutenberg"]["title_keywords"],
+            output_dir=os.path.join(OUTPUT_FOLDER, "gutenberg"),
+            store=store,
+        ),
+        "wikiquote": lambda: get_wikiquote_quotes(
+            config["wikiquote"]["page_titles"], config["wikiquote"]["phrases"], store=store,
+            api_url=config["wikiquote"].get("api_url"),
+        ),
+        "wikipedia": lambda: fetch_wikipedia_texts(
+            config["wikipedia"]["page_titles"], store=store, api_url=config["wikipedia"].get("api_url")
+        ),
+        "internet_archive": lambda: get_internet_archive_texts(
+            config["internet_archive"]["collection"],
+            config["internet_archive"]["mediatype"],
+            config["internet_archive"]["keyword_search"],
+            config["internet_archive"]["year"],
+            limit=config["internet_archive"].get("limit", 5),
+            output_dir=os.path.join(OUTPUT_FOLDER, "internet_archive"),
+            store=store,
+        ),
+        "reddit": lambda: fetch_reddit_texts(
+            config["reddit"]["subreddit_names"],
+            config["reddit"].get("post_limit", 10),
+            config["reddit"].get("comment_limit", 5),
+            store=store,
+            base_url=config["reddit"].get("base_url"),
+        ),
+        "wikidata": lambda: get_wikidata_items(
+            config["wikidata"]["queries"], store=store, endpoint=config["wikidata"].get("endpoint")
+        ),
+    })
+
+    # Everything is already saved in the corpus store; count what this run added
+    new_documents = store.documents(since_run=previous_runs[-1] if previous_runs else None)
+    new_counts = {source: sum(1 for entry in new_documents if entry["source"] == source) for source in results}
 
     print("\n💖 **ALL DATA FETCHED, HONEY!** 💖")
-    print("\n📚 Data breakdown:")
-    print(f"📂 Gutenberg Texts: {len(gutenberg_texts)}")
-    print(f"💬 Wikiquote Quotes: {len(wikiquote_texts)}")
-    print(f"🌎 Wikipedia Texts: {len(wikipedia_texts)}")
-    print(f"📜 Archive.org Texts: {len(archive_texts)}")
-    print(f"👥 Reddit Threads: {len(reddit_texts)}")
-    print(f"🔍 Wikidata Entries: {len(wikidata_entries)}")
-
-    print("\n📂 **All data has been saved in the `output/` folder!** 💾✨")
-
+    print("\n📚 Data breakdown (fetched / new):")
+    print(f"📂 Gutenberg Texts: {len(results['gutenberg'])} / {new_counts['gutenberg']}")
+    print(f"💬 Wikiquote Quotes: {len(results['wikiquote'])} / {new_counts['wikiquote']}")
+    print(f"🌎 Wikipedia Texts: {len(results['wikipedia'])} / {new_counts['wikipedia']}")
+    print(f"📜 Archive.org Texts: {len(results['internet_archive'])} / {new_counts['internet_archive']}")
+    print(f"👥 Reddit Threads: {len(results['reddit'])} / {new_counts['reddit']}")
+    print(f"🔍 Wikidata Entries: {len(results['wikidata'])} / {new_counts['wikidata']}")
+
+    print("\n⏱️ Fetch times:")
+    for source, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f"   {source}: {seconds:.1f}s")
+
+    print(f"\n📂 **All data has been saved in the `{store.root}/` store as run {run_id}!** 💾✨")
+
+    columnar = config.get("columnar_export", DEFAULT_COLUMNAR_EXPORT)
+    if columnar["enabled"]:
+        path = columnar_path(columnar["directory"], "documents", run_id, columnar.get("format", "parquet"))
+        rows = export_documents(store, path, since_run=previous_runs[-1] if previous_runs else None)
+        print(f"🧱 Exported {rows} new documents to {path}")
 
 if __name__ == "__main__":
-    main()
+    # Writes a JSON report of per-source and per-request timings to reports/ (INSTRUMENT_REPORTS=0 to skip)
+    with instrumented_run("collect"):
+        main()
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+from theme_detection import TOKEN_PATTERN, tokenize
+
+# 🗂️ POSITIONAL INVERTED INDEX
+DEFAULT_INDEX_PATH = os.path.join("cache", "passages.sqlite")
+DEFAULT_KWIC_WINDOW = 6
+
+class PassageIndex:
+    """A persistent term -> (document, sentence, position) index over the corpus.
+
+    Documents are split into real sentences and every lowercased word token gets a
+    posting, so keyword, prefix and phrase lookups are single indexed queries instead
+    of scans over every file. Re-adding a document with unchanged text is a no-op, and
+    a changed one is reindexed, so keeping the index current is incremental.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sentences (
+                doc_id INTEGER NOT NULL,
+                sent_idx INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (doc_id, sent_idx)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                sent_idx INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id, sent_idx, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_by_doc ON postings (doc_id);
+        """)
+        self._db.commit()
+
+    # 💾 Indexing
+    def add_document(self, name, text):
+        """Indexes a document; returns False if it was already indexed with the same text."""
+        from summarization import split_sentences  # Pulls in NLTK and scikit-learn, so only when indexing
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            row = self._db.execute("SELECT doc_id, content_hash FROM documents WHERE name=?", (name,)).fetchone()
+            if row and row[1] == content_hash:
+                return False
+            if row:
+                self._delete(row[0])
+
+            doc_id = self._db.execute("INSERT INTO documents (name, content_hash) VALUES (?, ?)",
+                                      (name, content_hash)).lastrowid
+            sentences = split_sentences(text)
+            self._db.executemany("INSERT INTO sentences VALUES (?, ?, ?)",
+                                 ((doc_id, sent_idx, sentence) for sent_idx, sentence in enumerate(sentences)))
+            self._db.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)", (
+                (term, doc_id, sent_idx, position)
+                for sent_idx, sentence in enumerate(sentences)
+                for position, term in enumerate(tokenize(sentence))
+            ))
+            self._db.commit()
+        return True
+
+    def update(self, texts):
+        """Brings the index up to date with a {name: text} dict; returns how many documents were (re)indexed."""
+        return sum(self.add_document(name, text) for name, text in texts.items())
+
+    def remove_document(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT doc_id FROM documents WHERE name=?", (name,)).fetchone()
+            if row:
+                self._delete(row[0])
+                self._db.commit()
+
+    def _delete(self, doc_id):
+        for table in ("postings", "sentences", "documents"):
+            self._db.execute(f"DELETE FROM {table} WHERE doc_id=?", (doc_id,))
+
+    # 🔎 Queries
+    def sentences_with(self, keywords, prefix=False, names=None):
+        """Returns (name, sent_idx, sentence) for sentences containing any keyword, in corpus order.
+
+        With prefix=True, single-word keywords also match longer words ("touch" finds
+        "touched"); multi-word keywords always match as exact phrases.
+        """
+        phrases = [keyword for keyword in keywords if len(tokenize(keyword)) > 1]
+        clauses, params = [], []
+        for keyword in keywords:
+            terms = tokenize(keyword)
+            if len(terms) != 1:
+                continue
+            term = terms[0]
+            if prefix:
+                clauses.append("(p.term >= ? AND p.term < ?)")
+                params += [term, term[:-1] + chr(ord(term[-1]) + 1)]
+            else:
+                clauses.append("p.term = ?")
+                params.append(term)
+        rows = set()
+        if clauses:
+            rows.update(self._query(f"""
+                SELECT DISTINCT d.name, s.sent_idx, s.text
+                FROM postings p
+                JOIN documents d ON d.doc_id = p.doc_id
+                JOIN sentences s ON s.doc_id = p.doc_id AND s.sent_idx = p.sent_idx
+                WHERE {" OR ".join(clauses)}
+            """, params))
+        # Multi-word keywords have to match as phrases
+        for phrase in phrases:
+            rows.update(self.phrase_search(phrase))
+        return sorted(row for row in rows if names is None or row[0] in names)
+
+    def phrase_search(self, phrase, names=None):
+        """Returns (name, sent_idx, sentence) for sentences containing the exact word sequence."""
+        terms = tokenize(phrase)
+        if not terms:
+            return []
+        joins = "".join(
+            f" JOIN postings p{i} ON p{i}.doc_id = p0.doc_id AND p{i}.sent_idx = p0.sent_idx"
+            f" AND p{i}.position = p0.position + {i} AND p{i}.term = ?"
+            for i in range(1, len(terms))
+        )
+        rows = self._query(f"""
+            SELECT DISTINCT d.name, s.sent_idx, s.text
+            FROM postings p0{joins}
+            JOIN documents d ON d.doc_id = p0.doc_id
+            JOIN sentences s ON s.doc_id = p0.doc_id AND s.sent_idx = p0.sent_idx
+            WHERE p0.term = ?
+            ORDER BY d.name, s.sent_idx
+        """, terms[1:] + terms[:1])
+        return [row for row in rows if names is None or row[0] in names]
+
+    def keyword_in_context(self, keyword, window=DEFAULT_KWIC_WINDOW, names=None):
+        """Returns (name, left context, keyword as written, right context) for each occurrence."""
+        term = tokenize(keyword)[:1]
+        if not term:
+            return []
+        lines = []
+        for name, _, sentence in self.sentences_with(term, names=names):
+            spans = [match.span() for match in TOKEN_PATTERN.finditer(sentence)]
+            for position, (start, end) in enumerate(spans):
+                if sentence[start:end].lower() == term[0]:
+                    left = sentence[spans[max(0, position - window)][0]:start].strip()
+                    right = sentence[end:spans[min(len(spans) - 1, position + window)][1]].strip()
+                    lines.append((name, left, sentence[start:end], right))
+        return lines
+
+    def extract_passages(self, keywords, num_passages=3, seed=0, prefix=True, names=None):
+        """Samples up to num_passages matching sentences per document, reproducibly for a given seed."""
+        by_document = {}
+        for name, _, sentence in self.sentences_with(keywords, prefix=prefix, names=names):
+            by_document.setdefault(name, []).append(sentence.strip())
+        return {
+            name: random.Random(f"{seed}:{name}").sample(matches, min(num_passages, len(matches)))
+            for name, matches in by_document.items()
+        }
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def close(self):
+        self._db.close()
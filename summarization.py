@@ -0,0 +1,90 @@
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer
+from utils import bounded_pool_map, SENTENCE_BREAK
+
+# 📖 SCALABLE LSA SUMMARIZATION
+DEFAULT_SUMMARY_SENTENCES = 3
+MAX_LSA_DIMENSIONS = 100  # Topics kept by the truncated SVD
+MAX_SENTENCES_PER_CHUNK = 2000  # Longer texts are summarized chunk by chunk, then across chunks
+MAX_PENDING_PER_JOB = 2
+
+def split_sentences(text):
+    """Splits text into sentences with NLTK's punkt model, or a punctuation regex if punkt is missing.
+
+    NLTK is imported on first use: importing it costs about two seconds.
+    """
+    import nltk
+    try:
+        sentences = nltk.sent_tokenize(text)
+    except LookupError:
+        sentences = SENTENCE_BREAK.split(text)
+    return [sentence.strip() for sentence in sentences if sentence.strip()]
+
+def lsa_rank(sentences, n_sentences=DEFAULT_SUMMARY_SENTENCES):
+    """Picks the n most salient sentences by LSA, returned in their original order.
+
+    Builds a sparse sentence x term count matrix and runs a randomized truncated SVD
+    on it. Each sentence is scored by the length of its vector in topic space (its row
+    of U·Σ), which is how sumy's LsaSummarizer ranks sentences, minus the dense SVD.
+    """
+    if len(sentences) <= n_sentences:
+        return list(sentences)
+
+    try:
+        matrix = CountVectorizer(stop_words="english").fit_transform(sentences)
+    except ValueError:
+        raise ValueError("no content words (text is empty or all stop words)")
+    dimensions = min(MAX_LSA_DIMENSIONS, min(matrix.shape) - 1)
+    if dimensions < 1:
+        scores = np.asarray(matrix.sum(axis=1)).ravel()
+    else:
+        topics = TruncatedSVD(n_components=dimensions, algorithm="randomized", random_state=0).fit_transform(matrix)
+        scores = np.linalg.norm(topics, axis=1)
+
+    best = np.argsort(-scores, kind="stable")[:n_sentences]
+    return [sentences[i] for i in sorted(best)]
+
+def summarize_text(text, n_sentences=DEFAULT_SUMMARY_SENTENCES, max_sentences_per_chunk=MAX_SENTENCES_PER_CHUNK):
+    """Summarizes a text, hierarchically when it has more than max_sentences_per_chunk sentences."""
+    sentences = split_sentences(text)
+    if not sentences:
+        raise ValueError("text is empty")
+
+    # Summarize each chunk, then summarize the chunk summaries, until it all fits in one chunk
+    max_sentences_per_chunk = max(max_sentences_per_chunk, 2 * n_sentences)
+    while len(sentences) > max_sentences_per_chunk:
+        sentences = [
+            sentence
+            for start in range(0, len(sentences), max_sentences_per_chunk)
+            for sentence in lsa_rank(sentences[start:start + max_sentences_per_chunk], n_sentences)
+        ]
+    return " ".join(lsa_rank(sentences, n_sentences))
+
+def summarize_document(item, n_sentences=DEFAULT_SUMMARY_SENTENCES):
+    """Summarizes one (name, text) pair; returns (name, {"summary", "seconds", "error"})."""
+    name, text = item
+    start = time.perf_counter()
+    try:
+        summary, error = summarize_text(text, n_sentences), None
+    except Exception as e:
+        summary, error = None, f"{type(e).__name__}: {e}"
+    return name, {"summary": summary, "seconds": time.perf_counter() - start, "error": error}
+
+def summarize_documents(texts, n_sentences=DEFAULT_SUMMARY_SENTENCES, n_jobs=1):
+    """Summarizes a {name: text} dict, across n_jobs worker processes if n_jobs > 1.
+
+    Returns {name: {"summary", "seconds", "error"}}; a failure in one document is
+    recorded in its "error" field and never stops the others.
+    """
+    items = iter(texts.items())
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            summarize = functools.partial(summarize_document, n_sentences=n_sentences)
+            results = dict(bounded_pool_map(pool, summarize, items, n_jobs * MAX_PENDING_PER_JOB))
+    else:
+        results = dict(summarize_document(item, n_sentences) for item in items)
+    return results
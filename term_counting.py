@@ -0,0 +1,97 @@
+import heapq
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from collections import Counter
+from operator import itemgetter
+
+# 🧮 BOUNDED-MEMORY TERM COUNTING
+DEFAULT_MAX_TERMS = 1_000_000  # Distinct terms held in memory before spilling to disk
+DEFAULT_NUM_SHARDS = 16
+
+class SpillingCounter:
+    """A term counter whose memory use is capped at max_terms distinct terms.
+
+    Partial counts are merged in memory until the vocabulary outgrows max_terms; then
+    every term is appended to one of num_shards files (chosen by a hash of the term)
+    and memory is cleared. A term always lands in the same shard, so the reduction can
+    merge one shard at a time and never needs more than about 1/num_shards of the
+    full vocabulary in memory.
+    """
+
+    def __init__(self, max_terms=DEFAULT_MAX_TERMS, num_shards=DEFAULT_NUM_SHARDS, spill_dir=None):
+        self.max_terms = max_terms
+        self.num_shards = num_shards
+        self.spill_dir = spill_dir
+        self.spills = 0
+        self._counts = Counter()
+        self._owns_spill_dir = spill_dir is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, partial_counts):
+        """Merges a mapping of term -> count (one worker's or batch's partial result)."""
+        self._counts.update(partial_counts)
+        if len(self._counts) > self.max_terms:
+            self._spill()
+
+    def _shard_of(self, term):
+        return zlib.crc32(term.encode("utf-8")) % self.num_shards
+
+    def _shard_path(self, shard):
+        return os.path.join(self.spill_dir, f"shard_{shard:03d}.jsonl")
+
+    def _spill(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="term_counts_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        shards = [[] for _ in range(self.num_shards)]
+        for term, count in self._counts.items():
+            shards[self._shard_of(term)].append(json.dumps([term, count], ensure_ascii=False))
+        for shard, lines in enumerate(shards):
+            if lines:
+                with open(self._shard_path(shard), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        self._counts = Counter()
+        self.spills += 1
+
+    def items(self):
+        """Yields every (term, total count), merging spilled shards one at a time."""
+        if not self.spills:
+            yield from self._counts.items()
+            return
+
+        in_memory = [Counter() for _ in range(self.num_shards)]
+        for term, count in self._counts.items():
+            in_memory[self._shard_of(term)][term] = count
+        for shard in range(self.num_shards):
+            totals = in_memory[shard]
+            in_memory[shard] = None
+            if os.path.exists(self._shard_path(shard)):
+                with open(self._shard_path(shard), "r", encoding="utf-8") as f:
+                    for line in f:
+                        term, count = json.loads(line)
+                        totals[term] += count
+            yield from totals.items()
+
+    def most_common(self, n):
+        """Returns the n most frequent (term, count) pairs without building the full vocabulary."""
+        return heapq.nlargest(n, self.items(), key=itemgetter(1))
+
+    def close(self):
+        """Removes spilled shard files (and the temporary directory if we created it)."""
+        if self.spill_dir and os.path.isdir(self.spill_dir):
+            if self._owns_spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+            else:
+                for shard in range(self.num_shards):
+                    if os.path.exists(self._shard_path(shard)):
+                        os.remove(self._shard_path(shard))
+        self._counts = Counter()
+        self.spills = 0
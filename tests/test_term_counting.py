@@ -0,0 +1,26 @@
+from collections import Counter
+from term_counting import SpillingCounter
+
+BATCHES = [
+    {"love": 5, "war": 1, "peace": 2},
+    {"love": 1, "ruin": 7, "grace": 3},
+    {"war": 9, "hope": 4, "peace": 1},
+    {"dawn": 6, "love": 2},
+]
+
+def test_spilling_counter_matches_counter():
+    expected = Counter()
+    with SpillingCounter(max_terms=1, num_shards=4) as counter:
+        for batch in BATCHES:
+            counter.update(batch)
+            expected.update(batch)
+        assert counter.spills > 0
+        assert dict(counter.items()) == dict(expected)
+        assert len(list(counter.items())) == len(expected)  # Each term reported once across shards
+        assert counter.most_common(3) == expected.most_common(3)
+
+def test_counter_without_spills():
+    with SpillingCounter(max_terms=100) as counter:
+        counter.update(BATCHES[0])
+        assert counter.spills == 0
+        assert dict(counter.items()) == BATCHES[0]
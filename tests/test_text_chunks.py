@@ -0,0 +1,23 @@
+from utils import iter_text_chunks
+
+TEXT = " ".join(f"Mr. Darcy{i} met Elizabeth Bennet near the old house." for i in range(300))
+
+def owned_text(chunks):
+    return "".join(chunk[:owned] for chunk, owned in chunks)
+
+def test_owned_prefixes_rebuild_a_string():
+    chunks = list(iter_text_chunks(TEXT, max_chars=1000, overlap=100))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 and owned <= len(chunk) for chunk, owned in chunks)
+    assert owned_text(chunks) == TEXT
+
+def test_owned_prefixes_rebuild_streamed_pieces():
+    pieces = (TEXT[i:i + 333] for i in range(0, len(TEXT), 333))
+    assert owned_text(iter_text_chunks(pieces, max_chars=1000, overlap=100)) == TEXT
+
+def test_unbroken_text_is_cut_anyway():
+    assert owned_text(iter_text_chunks("x" * 1000, max_chars=100, overlap=20)) == "x" * 1000
+
+def test_empty_input_yields_one_empty_chunk():
+    assert list(iter_text_chunks("")) == [("", 0)]
+    assert list(iter_text_chunks([])) == [("", 0)]
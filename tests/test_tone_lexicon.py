@@ -0,0 +1,10 @@
+from tone_lexicon import ToneMatcher
+
+def test_tag_terms_with_terms_that_grow_when_lowercased():
+    # "İ".lower() is two characters, which used to shift the tones of every later term
+    matcher = ToneMatcher({"x": ["love"]})
+    assert matcher.tag_terms(["İİİİİİ", "love", "x", "y"]) == {"İİİİİİ": (), "love": ("x",), "x": (), "y": ()}
+
+def test_tag_terms_matches_case_insensitively():
+    matcher = ToneMatcher({"warm": ["love"], "cold": ["hate"]})
+    assert matcher.tag_terms(["Lovely", "HATEFUL", "neutral"]) == {"Lovely": ("warm",), "HATEFUL": ("cold",), "neutral": ()}
@@ -1,63 +1,267 @@
-import spacy
 import re
-from collections import Counter
+import itertools
+import threading
+import time
+from collections import Counter, deque
+from extraction_cache import document_hash
+from instrumentation import span, record
+from tone_lexicon import get_tone_lexicon
+from term_counting import SpillingCounter, DEFAULT_MAX_TERMS
+from utils import iter_text_chunks, DEFAULT_CHUNK_CHARS
 
-nlp = spacy.load("en_core_web_sm")  # Load the English language model
+NLP_MODEL = "en_core_web_sm"
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Returns the shared spaCy pipeline, loading the English language model on first use.
+
+    spaCy itself is imported here too, so modules that only import text_processing
+    (columnar_export, and through it main.py) don't pay for it.
+    """
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            _nlp = spacy.load(NLP_MODEL)
+        return _nlp
+
+def __getattr__(name):
+    # Keeps `text_processing.nlp` working without loading the model at import time
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ⚙️ BATCHED PIPELINE SETTINGS
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_N_PROCESS = 1  # Raise to the number of cores on big runs; -1 uses them all
+
+# Pipeline components each kind of output depends on; anything not needed is disabled
+ALL_OUTPUTS = ("lemmas", "entities", "noun_chunks")
+OUTPUT_COMPONENTS = {
+    "lemmas": ("tok2vec", "tagger", "attribute_ruler", "lemmatizer"),
+    "entities": ("tok2vec", "ner"),
+    "noun_chunks": ("tok2vec", "tagger", "attribute_ruler", "parser"),
+}
+CONTENT_POS = ("NOUN", "ADJ", "VERB", "ADV")
+
+def disabled_components(outputs):
+    """Lists the loaded pipeline components that none of the requested outputs need."""
+    needed = {component for output in outputs for component in OUTPUT_COMPONENTS[output]}
+    return [name for name in get_nlp().pipe_names if name not in needed]
+
+def pipe_chunked(texts_with_context, outputs=ALL_OUTPUTS, batch_size=DEFAULT_BATCH_SIZE,
+                 n_process=DEFAULT_N_PROCESS, max_chars=DEFAULT_CHUNK_CHARS):
+    """Runs (text, context) pairs through nlp.pipe, one bounded chunk at a time.
+
+    Long texts are split by utils.iter_text_chunks, so no Doc is ever longer than
+    max_chars. Yields (context, docs) per input text, where docs lazily yields that
+    text's chunk Docs in order; consume it before moving on to the next text.
+
+    Chunks overlap, so each Doc's user_data["owned_chars"] says where its own text
+    ends; use owned_tokens / owned_spans to skip what the next chunk will report.
+    """
+    # Only time spent inside nlp.pipe is recorded: not the caller's work between Docs,
+    # and not the time nlp.pipe spends pulling (and cache-checking) the input texts
+    timing = {"input": 0.0, "parse": 0.0, "total_parse": 0.0}
+    batch = {"docs": 0, "tokens": 0, "bytes": 0}
+    total = {"docs": 0, "tokens": 0, "bytes": 0}
+
+    def chunks():
+        resumed = time.perf_counter()
+        for index, (text, context) in enumerate(texts_with_context):
+            for chunk, owned_chars in iter_text_chunks(text, max_chars):
+                timing["input"] += time.perf_counter() - resumed
+                yield chunk, (index, context, owned_chars)
+                resumed = time.perf_counter()
+        timing["input"] += time.perf_counter() - resumed
+
+    def timed(piped):
+        while True:
+            start, input_before = time.perf_counter(), timing["input"]
+            try:
+                item = next(piped)
+            except StopIteration:
+                return
+            finally:
+                timing["parse"] += time.perf_counter() - start - (timing["input"] - input_before)
+            yield item
+
+    def counted(group):
+        # Every batch_size chunk Docs, record how long nlp.pipe took to produce them
+        for doc, (_, _, owned_chars) in group:
+            doc.user_data["owned_chars"] = owned_chars
+            batch["docs"] += 1
+            batch["tokens"] += len(doc)
+            batch["bytes"] += len(doc.text)
+            if batch["docs"] == batch_size:
+                flush()
+            yield doc
+
+    def flush():
+        if batch["docs"]:
+            record("spacy.batch", timing["parse"], **batch)
+        for key, value in batch.items():
+            total[key] += value
+        batch.update(docs=0, tokens=0, bytes=0)
+        timing["total_parse"] += timing["parse"]
+        timing["parse"] = 0.0
+
+    piped = get_nlp().pipe(chunks(), as_tuples=True, batch_size=batch_size, n_process=n_process,
+                           disable=disabled_components(outputs))
+    try:
+        for (_, context), group in itertools.groupby(timed(iter(piped)), key=lambda pair: pair[1][:2]):
+            yield context, counted(group)
+    finally:
+        flush()
+        record("spacy.pipe", timing["total_parse"], **total)
+
+def owned_tokens(doc):
+    """The tokens that start in the part of a chunk Doc that no other chunk reports."""
+    owned_chars = doc.user_data.get("owned_chars", len(doc.text))
+    return (token for token in doc if token.idx < owned_chars)
+
+def owned_spans(doc, spans):
+    """The spans (entities, noun chunks) that start in the chunk Doc's own part; straddling ones come out whole."""
+    owned_chars = doc.user_data.get("owned_chars", len(doc.text))
+    return (item for item in spans if item.start_char < owned_chars)
+
+def _is_content_token(token):
+    return token.pos_ in CONTENT_POS and not token.is_stop and not token.is_punct and not token.is_space
 
 def preprocess_text(text):
     """Process the input text using spaCy."""
-    doc = nlp(text)
-    # Extract relevant tokens (nouns, adjectives, verbs, adverbs) and lemmatize
-    return [token.lemma_.lower() for token in doc if token.pos_ in ("NOUN", "ADJ", "VERB", "ADV") and not token.is_stop and not token.is_punct and not token.is_space]
+    return next(iter_preprocessed([text]))
     # Consider adding named entities as well
     # return [token.lemma_.lower() for token in doc if token.pos_ in ("NOUN", "ADJ", "VERB", "ADV") and not token.is_stop] + [ent.text for ent in doc.ents]
 
+def iter_preprocessed(texts, batch_size=DEFAULT_BATCH_SIZE, n_process=DEFAULT_N_PROCESS, max_chars=DEFAULT_CHUNK_CHARS):
+    """Yields the lemmatized content words of each text, processing the texts in batches."""
+    for _, docs in pipe_chunked(((text, None) for text in texts), ("lemmas",), batch_size, n_process, max_chars):
+        # Extract relevant tokens (nouns, adjectives, verbs, adverbs) and lemmatize
+        yield [token.lemma_.lower() for doc in docs for token in owned_tokens(doc) if _is_content_token(token)]
+
 
 def extract_keywords_and_phrases(text, category_name):
     """Extract key terms using spaCy."""
-    doc = nlp(text)
-    keywords = []
+    return next(iter_keywords([text], category_name))
+
+def iter_keywords(texts, category_name, outputs=ALL_OUTPUTS, batch_size=DEFAULT_BATCH_SIZE,
+                  n_process=DEFAULT_N_PROCESS, max_chars=DEFAULT_CHUNK_CHARS):
+    """Streams the extract_keywords_and_phrases result for each text, one document at a time."""
+    for _, docs in pipe_chunked(((text, None) for text in texts), outputs, batch_size, n_process, max_chars):
+        yield [keyword for doc in docs for keyword in keywords_from_doc(doc, category_name, outputs)]
+
+def keywords_from_doc(doc, category_name, outputs=ALL_OUTPUTS):
+    """Pulls lemmas, entities and noun chunks (whichever are requested) out of a parsed doc."""
+    candidates = []
 
     # Add relevant lemmas (nouns, adjectives, verbs, adverbs)
-    for token in doc:
-      if token.pos_ in ("NOUN", "ADJ", "VERB", "ADV") and not token.is_stop and not token.is_punct and not token.is_space:
-        keywords.append({"term": token.lemma_.lower(), "tone": assign_tone(token.lemma_.lower(), category_name)})
+    if "lemmas" in outputs:
+        for token in owned_tokens(doc):
+            if _is_content_token(token):
+                candidates.append((token.lemma_.lower(), "lemma", token.pos_))
 
     # Add named entities
-    for ent in doc.ents:
-        keywords.append({"term": ent.text, "tone": assign_tone(ent.text, category_name)})
+    if "entities" in outputs:
+        for ent in owned_spans(doc, doc.ents):
+            candidates.append((ent.text, "entity", ent.root.pos_))
 
     # Add noun chunks (multi-word phrases)
-    for chunk in doc.noun_chunks:
-        keywords.append({"term": chunk.text, "tone": assign_tone(chunk.text, category_name)})
+    if "noun_chunks" in outputs:
+        for chunk in owned_spans(doc, doc.noun_chunks):
+            candidates.append((chunk.text, "noun_chunk", chunk.root.pos_))
 
-    return keywords
+    # Tag every distinct candidate term in one pass over the compiled tone lexicon
+    tones = get_tone_lexicon().tag_terms([term for term, _, _ in candidates], category_name)
+    return [{"term": term, "kind": kind, "pos": pos, "tone": list(tones[term])} for term, kind, pos in candidates]
 
 def assign_tone(term, category_name):
-    """Assign tone to the term based on the category (placeholder - needs improvement)."""
-    # VERY basic example - replace with VADER or a custom lexicon
-    tone = []
-    if category_name == "Explicit Sexual Acts":
-      for word in ["fuck", "cum", "rimming", "fisting", "docking", "bdsm", "pegging"]:
-        if word in term.lower():
-          tone.append("explicit")
-          break
-
-    elif category_name == "Emotional Intensity & States":
-      for word in ["love", "affection", "romantic"]:
-        if word in term.lower():
-          tone.append("romantic")
-          break
-
-    return tone
-
-def process_texts(texts):
-    """Processes a list of texts and returns word frequencies."""
-    all_words = []
-    for text in texts:
-        # Use the improved extraction
-        keywords = extract_keywords_and_phrases(text, "General")  # Use a general category for initial extraction
-        all_words.extend([kw["term"] for kw in keywords])  # Extract just the terms
-
-    word_counts = Counter(all_words)
-    return dict(word_counts)  # Convert Counter to a regular dictionary
+    """Assign tone to the term based on the category, using the trigger words in tone_lexicon.json."""
+    return list(get_tone_lexicon().tag_terms([term], category_name)[term])
+
+# 🧠 CACHED, AGGREGATED EXTRACTION
+def _aggregate_docs(docs, category_name, outputs):
+    """Collapses the keywords of a text's chunk Docs into [term, kind, pos, tone, count] rows."""
+    counts = Counter()
+    for doc in docs:
+        counts.update((kw["term"], kw["kind"], kw["pos"], tuple(kw["tone"]))
+                      for kw in keywords_from_doc(doc, category_name, outputs))
+    return [[term, kind, pos, list(tone), count] for (term, kind, pos, tone), count in counts.items()]
+
+def extraction_key(doc_hash, category_name, outputs):
+    """Builds the ExtractionCache key for a document under the loaded model and tone lexicon."""
+    meta = get_nlp().meta
+    model = f"{meta.get('lang', '')}_{meta.get('name', '')}"
+    version = f"{meta.get('version', '')}+tones.{get_tone_lexicon().fingerprint}"
+    return (doc_hash, model, version, category_name, ",".join(sorted(outputs)))
+
+def iter_keyword_rows(texts, category_name, outputs=ALL_OUTPUTS, batch_size=DEFAULT_BATCH_SIZE,
+                      n_process=DEFAULT_N_PROCESS, cache=None, max_chars=DEFAULT_CHUNK_CHARS):
+    """Yields (document hash, aggregated keyword rows) per document, parsing only documents the cache lacks.
+
+    Long documents are parsed in chunks of at most max_chars and their counts summed.
+    Cached documents are yielded as soon as the parser has caught up with them, so the
+    order can differ from the input order.
+
+    nlp.pipe keeps pulling input until it has a batch of texts to parse, so with a warm
+    cache it would read every document (and hold every hit's rows) before yielding
+    anything. Each hit therefore also sends an empty placeholder text through the
+    parser, which costs next to nothing but makes it hand back a batch at least every
+    batch_size inputs; at most that many hits are ever waiting.
+    """
+    hits = deque()
+
+    def misses():
+        for text in texts:
+            doc_hash = document_hash(text)
+            key = extraction_key(doc_hash, category_name, outputs)
+            rows = cache.get(key) if cache is not None else None
+            if rows is None:
+                yield text, key
+            else:
+                hits.append((doc_hash, rows))
+                yield "", None
+
+    for key, docs in pipe_chunked(misses(), outputs, batch_size, n_process, max_chars):
+        while hits:
+            yield hits.popleft()
+        if key is None:
+            continue
+        rows = _aggregate_docs(docs, category_name, outputs)
+        if cache is not None:
+            cache.put(key, rows)
+        yield key[0], rows
+    while hits:
+        yield hits.popleft()
+
+def process_texts(texts, outputs=ALL_OUTPUTS, batch_size=DEFAULT_BATCH_SIZE, n_process=DEFAULT_N_PROCESS,
+                  cache=None, max_chars=DEFAULT_CHUNK_CHARS, top_n=None, max_terms=DEFAULT_MAX_TERMS):
+    """Processes a list of texts and returns word frequencies.
+
+    Texts can be any iterable (e.g. utils.iter_file_texts), and are parsed in batches of
+    `batch_size` across `n_process` worker processes, book-length ones in chunks of at
+    most `max_chars`. With an ExtractionCache, only new or changed documents are parsed
+    and the rest are merged in from the cache.
+
+    Each batch of documents is counted into a partial Counter that is then merged into
+    a SpillingCounter, which spills to disk once it holds more than `max_terms` terms.
+    With `top_n`, only the most frequent terms are returned, most frequent first.
+    """
+    with span("process_texts") as processing, SpillingCounter(max_terms) as word_counts:
+        partial = Counter()
+        index = 0
+        # Use a general category for initial extraction
+        keyword_rows = iter_keyword_rows(texts, "General", outputs, batch_size, n_process, cache, max_chars)
+        for index, (_, rows) in enumerate(keyword_rows, 1):
+            for term, _, _, _, count in rows:  # Extract just the terms
+                partial[term] += count
+            if index % batch_size == 0:
+                word_counts.update(partial)
+                partial = Counter()
+        word_counts.update(partial)
+        processing.add(docs=index)
+
+        if top_n is not None:
+            return dict(word_counts.most_common(top_n))
+        return dict(word_counts.items())  # Convert to a regular dictionary
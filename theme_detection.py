@@ -0,0 +1,77 @@
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils import bounded_pool_map
+
+# 🔥 SINGLE-PASS THEME DETECTION
+THEMES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes.json")
+TOKEN_PATTERN = re.compile(r"\w+")
+MAX_PENDING_PER_JOB = 4  # Documents queued per worker, so a huge corpus is never all in flight
+
+def load_themes(path=THEMES_FILE):
+    """Loads {theme: [keywords]} from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def tokenize(text):
+    """Lowercased word tokens, split the same way \\b...\\b keyword matching would."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class ThemeDetector:
+    """Counts every theme keyword in one tokenization pass per document.
+
+    Keywords (single words or phrases) are mapped to columns of a keyword x theme
+    incidence matrix, so a document's keyword counts become its theme counts with one
+    matrix product, however many themes there are.
+    """
+
+    def __init__(self, themes):
+        self.themes = list(themes)
+        keywords = {}
+        for keyword_list in themes.values():
+            for keyword in keyword_list:
+                keywords.setdefault(" ".join(tokenize(keyword)), len(keywords))
+        keywords.pop("", None)
+        self.keywords = list(keywords)
+        self._column = {keyword: column for column, keyword in enumerate(self.keywords)}
+        self._ngram_sizes = sorted({len(keyword.split()) for keyword in self.keywords})
+
+        self.incidence = np.zeros((len(self.keywords), len(self.themes)), dtype=np.int64)
+        for theme_index, theme in enumerate(self.themes):
+            for keyword in themes[theme]:
+                column = self._column.get(" ".join(tokenize(keyword)))
+                if column is not None:
+                    self.incidence[column, theme_index] += 1
+
+    def keyword_counts(self, text):
+        """Returns a vector with the number of occurrences of each keyword in one text."""
+        tokens = tokenize(text)
+        counts = np.zeros(len(self.keywords), dtype=np.int64)
+        for size in self._ngram_sizes:
+            grams = tokens if size == 1 else (" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+            for gram, count in Counter(grams).items():
+                column = self._column.get(gram)
+                if column is not None:
+                    counts[column] += count
+        return counts
+
+    def count_matrix(self, texts, n_jobs=1):
+        """Returns a (documents x themes) count matrix, rows in the order of `texts`.
+
+        With n_jobs > 1, documents are tokenized in worker processes.
+        """
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                rows = list(bounded_pool_map(pool, self.keyword_counts, texts, n_jobs * MAX_PENDING_PER_JOB))
+        else:
+            rows = [self.keyword_counts(text) for text in texts]
+        if not rows:
+            return np.zeros((0, len(self.themes)), dtype=np.int64)
+        return np.vstack(rows) @ self.incidence
+
+    def totals(self, matrix):
+        """Collapses a count matrix into {theme: total mentions}."""
+        return dict(zip(self.themes, matrix.sum(axis=0).tolist()))
@@ -0,0 +1,135 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+
+# 🎨 TONE LEXICON
+TONE_LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tone_lexicon.json")
+MEMO_MAX_TERMS = 200_000  # Per category; the memo is simply cleared when it fills up
+
+def load_tone_lexicon(path=TONE_LEXICON_FILE):
+    """Loads {category: {tone: [trigger words]}} from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _trie_pattern(words):
+    """Builds a regex alternation factored by common prefixes, so matching cost tracks word length, not word count."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Greedy optional suffix: the longest trigger starting at a position wins
+            return f"(?:{body})?" if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+class ToneMatcher:
+    """Finds the tones of one category's trigger words anywhere inside a term.
+
+    All trigger words are compiled into one prefix-factored regex and matched
+    (case-insensitively, as substrings) at every position via a lookahead. Each match
+    reports the tones of its trigger plus those of any shorter trigger it starts with,
+    so overlapping triggers are never missed.
+    """
+
+    def __init__(self, tones):
+        self._tone_order = list(tones)
+        tones_of = {}
+        for tone, words in tones.items():
+            for word in words:
+                tones_of.setdefault(word.lower(), set()).add(tone)
+        self._tones_of = {word: self._with_prefix_tones(word, tones_of) for word in tones_of}
+        self._pattern = re.compile(f"(?=({_trie_pattern(self._tones_of)}))") if tones_of else None
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _with_prefix_tones(word, tones_of):
+        tones = set()
+        for end in range(1, len(word) + 1):
+            tones |= tones_of.get(word[:end], set())
+        return tones
+
+    def _ordered(self, tones):
+        return tuple(tone for tone in self._tone_order if tone in tones)
+
+    def tones(self, term):
+        """Returns the tones triggered by a single term, as a tuple."""
+        return self.tag_terms([term])[term]
+
+    def tag_terms(self, terms):
+        """Tags many terms at once: a single regex scan over all not-yet-memoized terms.
+
+        Returns {term: tones tuple}.
+        """
+        result = {}
+        pending = []
+        for term in terms:
+            if term in result:
+                continue
+            cached = self._memo.get(term)
+            if cached is None:
+                pending.append(term)
+                result[term] = ()
+            else:
+                result[term] = cached
+
+        if pending and self._pattern is not None:
+            # Scan all pending terms in one pass; newlines keep matches inside one term.
+            # Offsets come from the lowercased terms, since lower() can change a term's length ("İ")
+            lowered = [term.lower() for term in pending]
+            offsets, position = [], 0
+            for term in lowered:
+                offsets.append(position)
+                position += len(term) + 1
+            found = [set() for _ in pending]
+            for match in self._pattern.finditer("\n".join(lowered)):
+                found[bisect.bisect_right(offsets, match.start()) - 1] |= self._tones_of[match.group(1)]
+            for term, tones in zip(pending, found):
+                result[term] = self._ordered(tones)
+
+        with self._lock:
+            if len(self._memo) + len(pending) > MEMO_MAX_TERMS:
+                self._memo.clear()
+            self._memo.update((term, result[term]) for term in pending)
+        return result
+
+class ToneLexicon:
+    """One compiled ToneMatcher per category."""
+
+    def __init__(self, lexicon):
+        self._matchers = {category: ToneMatcher(tones) for category, tones in lexicon.items()}
+        # Short digest of the lexicon contents, so caches of tagged terms can tell when it changed
+        self.fingerprint = hashlib.sha256(json.dumps(lexicon, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    def categories(self):
+        return list(self._matchers)
+
+    def tag_terms(self, terms, category_name):
+        """Returns {term: tones tuple}; categories without an entry tag nothing."""
+        matcher = self._matchers.get(category_name)
+        if matcher is None:
+            return {term: () for term in terms}
+        return matcher.tag_terms(terms)
+
+_tone_lexicon = None
+
+def get_tone_lexicon():
+    """Returns the shared ToneLexicon, compiling tone_lexicon.json on first use."""
+    global _tone_lexicon
+    if _tone_lexicon is None:
+        _tone_lexicon = ToneLexicon(load_tone_lexicon())
+    return _tone_lexicon
@@ -1,6 +1,89 @@
+import re
+from collections import deque
+
 def remove_duplicates(input_list):
     """Removes duplicate items from a list while preserving order."""
     seen = set()
     return [x for x in input_list if not (x in seen or seen.add(x))]
 
+def iter_file_texts(paths):
+    """Yields the contents of each file in turn, so only one text is in memory at a time."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            yield f.read()
+
+def bounded_pool_map(pool, func, items, max_pending):
+    """Like pool.map, but keeps at most max_pending items submitted at a time.
+
+    Results come back in input order, and items are pulled from the iterable lazily,
+    so a huge corpus never sits in the executor's queue all at once.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# ✂️ CHUNKING LONG TEXTS
+DEFAULT_CHUNK_CHARS = 100_000  # spaCy needs roughly 1GB per 100k characters for parser and NER
+DEFAULT_CHUNK_OVERLAP = 1_000  # Characters each chunk reads past its cut, so spans crossing it stay whole
+PARAGRAPH_BREAK = re.compile(r"\n[ \t\r]*\n\s*")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+")
+WHITESPACE = re.compile(r"\s+")
+
+def _find_cut(buffer, max_chars):
+    """Picks where to end the next chunk: the last paragraph break, else sentence end, else space."""
+    window = buffer[:max_chars]
+    for pattern in (PARAGRAPH_BREAK, SENTENCE_BREAK, WHITESPACE):
+        last = None
+        for last in pattern.finditer(window, max_chars // 2):
+            pass
+        if last is not None:
+            return last.end()
+    return max_chars  # One unbroken run of max_chars characters; nothing better to do
+
+def _overlap_end(buffer, cut, overlap):
+    """End of the read-ahead after a cut: up to overlap more characters, stopping at the last whitespace."""
+    tail = buffer[cut:cut + overlap]
+    last = None
+    for last in WHITESPACE.finditer(tail):
+        pass
+    return cut + (last.start() if last is not None and len(tail) == overlap else len(tail))
+
+def iter_text_chunks(pieces, max_chars=DEFAULT_CHUNK_CHARS, overlap=DEFAULT_CHUNK_OVERLAP):
+    """Splits text into windows of at most max_chars; yields (chunk, owned_chars) pairs.
+
+    `pieces` is either a whole string or an iterable of strings (e.g. an open file), so
+    a book never has to be read into memory at once. Always yields at least one chunk.
+
+    Cuts prefer paragraph breaks, then sentence ends, then whitespace, but a sentence
+    fallback can still land after an abbreviation ("Mr." | "Darcy") and the whitespace
+    one mid-phrase. So each chunk reads up to `overlap` characters past its cut: only
+    its first owned_chars characters are its own, and anything starting after them
+    (a token, entity or noun chunk) belongs to the next chunk, which starts at the cut.
+    An entity or noun chunk that straddles a cut is therefore seen whole exactly once,
+    as long as it is shorter than the overlap.
+    """
+    overlap = min(overlap, max_chars // 4)
+    if isinstance(pieces, str):
+        if len(pieces) <= max_chars:
+            yield pieces, len(pieces)
+            return
+        text = pieces
+        pieces = (text[i:i + max_chars] for i in range(0, len(text), max_chars))
+
+    buffer = ""
+    emitted = False
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) > max_chars:
+            cut = _find_cut(buffer, max_chars - overlap)
+            yield buffer[:_overlap_end(buffer, cut, overlap)], cut
+            emitted = True
+            buffer = buffer[cut:]
+    if buffer or not emitted:
+        yield buffer, len(buffer)
+
 # Add any other utility functions you might need here